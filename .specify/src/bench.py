@@ -0,0 +1,150 @@
+"""
+Benchmark of the TodoApp task store: list-backed (old) vs ID-indexed (new).
+
+Builds each store with N tasks, then times random get / update / toggle /
+delete calls and reports the memory used by the tasks. The old store is a
+copy of the original list-based implementation with a plain (non-slots)
+Task dataclass. Its operations are O(n), so it runs fewer of them.
+
+    cd .specify/src
+    python bench.py --tasks 1000000 --ops 100000 --old-ops 200
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Optional
+
+from todo import TodoApp
+
+
+@dataclass
+class ListTask:
+    """
+    The Task model before __slots__.
+    """
+    id: int
+    title: str
+    description: str = ""
+    completed: bool = False
+
+
+class ListTodoApp:
+    """
+    The original list-backed store: every lookup is a linear scan.
+    """
+    def __init__(self):
+        self.tasks: List[ListTask] = []
+        self.next_id: int = 1
+
+    def add_task(self, title: str, description: str = "") -> Optional[ListTask]:
+        if not title or not title.strip():
+            return None
+        task = ListTask(id=self.next_id, title=title.strip(), description=description.strip())
+        self.tasks.append(task)
+        self.next_id += 1
+        return task
+
+    def get_task(self, task_id: int) -> Optional[ListTask]:
+        for task in self.tasks:
+            if task.id == task_id:
+                return task
+        return None
+
+    def update_task(self, task_id: int, title: str = None, description: str = None) -> bool:
+        task = self.get_task(task_id)
+        if task is None:
+            return False
+        if title is not None:
+            task.title = title.strip()
+        if description is not None:
+            task.description = description.strip()
+        return True
+
+    def delete_task(self, task_id: int) -> bool:
+        task = self.get_task(task_id)
+        if task is None:
+            return False
+        self.tasks.remove(task)
+        return True
+
+    def toggle_task_completion(self, task_id: int) -> bool:
+        task = self.get_task(task_id)
+        if task is None:
+            return False
+        task.completed = not task.completed
+        return True
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=100_000, help="operations per kind, new store")
+    parser.add_argument("--old-ops", type=int, default=200, help="operations per kind, old store")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-store.json")
+    return parser.parse_args(argv)
+
+
+def build(store_class, count: int):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    app = store_class()
+    for i in range(count):
+        app.add_task(f"Task {i}", "")
+    elapsed = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return app, {"build_s": elapsed, "memory_mb": memory / 2**20, "bytes_per_task": memory / count}
+
+
+def time_ops(app, count: int, ops: int, rng: random.Random) -> dict:
+    """Microseconds per call for each operation, on random existing IDs."""
+    ids = [rng.randint(1, count) for _ in range(ops)]
+    results = {}
+    for name, call in (
+        ("get", lambda task_id: app.get_task(task_id)),
+        ("update", lambda task_id: app.update_task(task_id, title="Renamed")),
+        ("toggle", lambda task_id: app.toggle_task_completion(task_id)),
+    ):
+        started = time.perf_counter()
+        for task_id in ids:
+            call(task_id)
+        results[f"{name}_us"] = (time.perf_counter() - started) / ops * 1e6
+
+    # Distinct IDs, so every delete finds its task
+    doomed = rng.sample(range(1, count + 1), ops)
+    started = time.perf_counter()
+    for task_id in doomed:
+        app.delete_task(task_id)
+    results["delete_us"] = (time.perf_counter() - started) / ops * 1e6
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    report = {"tasks": args.tasks}
+    for name, store_class, ops in (("old", ListTodoApp, args.old_ops), ("new", TodoApp, args.ops)):
+        app, stats = build(store_class, args.tasks)
+        stats.update(time_ops(app, args.tasks, ops, random.Random(args.seed)))
+        stats["ops"] = ops
+        report[name] = stats
+        del app
+
+    keys = [key for key in report["new"] if key != "ops"]
+    print(f"{'':<16} {'old':>12} {'new':>12} {'old/new':>9}")
+    for key in keys:
+        old, new = report["old"][key], report["new"][key]
+        print(f"{key:<16} {old:>12.2f} {new:>12.2f} {old / new if new else 0:>8.1f}x")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
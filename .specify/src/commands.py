@@ -0,0 +1,160 @@
+"""
+Non-interactive commands for the Todo CLI.
+
+Each operation is a dict such as {"op": "add", "title": "Buy milk"} and
+produces one JSON result line, {"ok": true, ...} or {"ok": false,
+"error": ...}. The same operations back the command-line subcommands and
+batch mode, where a file or stdin holds one JSON operation per line.
+
+    add     title, description?          -> task
+    get     id                           -> task
+    update  id, title?, description?     -> task
+    toggle  id                           -> task
+    delete  id                           -> id
+    list    completed?, contains?        -> tasks
+    count   completed?                   -> count
+"""
+import json
+from dataclasses import asdict
+from typing import Iterable, TextIO
+
+from todo import TodoApp
+
+# Results are written in chunks of this many lines instead of one write
+# per operation.
+WRITE_BUFFER_LINES = 1000
+
+class CommandError(Exception):
+    """
+    An operation that cannot be applied (bad input or unknown task).
+    """
+
+
+def _task_id(op: dict) -> int:
+    try:
+        return int(op["id"])
+    except (KeyError, TypeError, ValueError):
+        raise CommandError("A numeric 'id' is required")
+
+
+def _completed(op: dict):
+    completed = op.get("completed")
+    if completed is not None and not isinstance(completed, bool):
+        raise CommandError("'completed' must be true, false or omitted")
+    return completed
+
+
+def _found(task, task_id: int) -> dict:
+    if task is None:
+        raise CommandError(f"Task with ID {task_id} not found")
+    return {"ok": True, "task": asdict(task)}
+
+
+def execute(app: TodoApp, op: dict) -> dict:
+    """
+    Apply one operation to the app.
+
+    Args:
+        app: The TodoApp to operate on
+        op: The operation, with its name under "op"
+
+    Returns:
+        The result dict (always has "ok")
+    """
+    try:
+        name = op.get("op")
+        if name == "add":
+            task = app.add_task(str(op.get("title") or ""), str(op.get("description") or ""))
+            if task is None:
+                raise CommandError("Task title cannot be empty")
+            return {"ok": True, "task": asdict(task)}
+
+        if name == "get":
+            task_id = _task_id(op)
+            return _found(app.get_task(task_id), task_id)
+
+        if name == "update":
+            task_id = _task_id(op)
+            title = op.get("title")
+            if title is not None and not str(title).strip():
+                raise CommandError("Task title cannot be empty")
+            description = op.get("description")
+            app.update_task(task_id,
+                            None if title is None else str(title),
+                            None if description is None else str(description))
+            return _found(app.get_task(task_id), task_id)
+
+        if name == "toggle":
+            task_id = _task_id(op)
+            app.toggle_task_completion(task_id)
+            return _found(app.get_task(task_id), task_id)
+
+        if name == "delete":
+            task_id = _task_id(op)
+            if not app.delete_task(task_id):
+                raise CommandError(f"Task with ID {task_id} not found")
+            return {"ok": True, "id": task_id}
+
+        if name == "list":
+            tasks = app.list_tasks(_completed(op))
+            contains = op.get("contains")
+            if contains:
+                needle = str(contains).lower()
+                tasks = [task for task in tasks
+                         if needle in task.title.lower() or needle in task.description.lower()]
+            return {"ok": True, "tasks": [asdict(task) for task in tasks]}
+
+        if name == "count":
+            return {"ok": True, "count": app.count_tasks(_completed(op))}
+
+        raise CommandError(f"Unknown operation: {name!r}")
+    except CommandError as e:
+        return {"ok": False, "error": str(e)}
+
+
+def encode(result: dict) -> str:
+    """
+    Format a result as one line of compact JSON.
+    """
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def run_batch(app: TodoApp, lines: Iterable[str], out: TextIO) -> int:
+    """
+    Apply one JSON operation per input line, writing one result per line.
+
+    Blank lines are skipped. A line that is not a JSON object produces an
+    error result that carries its line number; later lines still run.
+    The whole batch runs inside one store transaction (one fsync or
+    commit at the end rather than one per change).
+
+    Args:
+        app: The TodoApp to operate on
+        lines: Input lines (a file or sys.stdin)
+        out: Where to write results
+
+    Returns:
+        The number of failed operations
+    """
+    failures = 0
+    buffer = []
+    with app.store.transaction():
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                op = json.loads(line)
+                if not isinstance(op, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                result = {"ok": False, "line": number, "error": f"Invalid JSON: {e}"}
+            else:
+                result = execute(app, op)
+            failures += not result["ok"]
+            buffer.append(encode(result))
+            if len(buffer) >= WRITE_BUFFER_LINES:
+                out.write("".join(buffer))
+                buffer.clear()
+    out.write("".join(buffer))
+    out.flush()
+    return failures
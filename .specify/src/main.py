@@ -1,7 +1,12 @@
 """
 Console-based Todo application main entry point.
 """
+import argparse
+import sys
+
 from todo import TodoApp
+from storage import open_store
+from commands import encode, execute, run_batch
 
 from models import Task
 
@@ -31,12 +36,96 @@ def get_task_display_string(task: Task) -> str:
     status = "✓" if task.completed else "○"
     return f"[{status}] ID: {task.id} - {task.title}"
 
-def main():
+def parse_args(argv=None):
+    """
+    Parse command-line options.
+
+    Without a subcommand the interactive menu runs. Subcommands apply one
+    operation (or a batch of them) and print JSON results, for scripts.
+
+    Args:
+        argv: Argument list (defaults to sys.argv)
+
+    Returns:
+        The parsed options
+    """
+    parser = argparse.ArgumentParser(description="Console Todo application")
+    parser.add_argument("--store", choices=["memory", "journal", "sqlite"], default="memory",
+                        help="where tasks are kept (default: memory, lost on exit)")
+    parser.add_argument("--path", help="file for the journal or sqlite store")
+    commands = parser.add_subparsers(dest="op")
+
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("title")
+    add.add_argument("-d", "--description", default="")
+
+    for name in ("get", "toggle", "delete"):
+        command = commands.add_parser(name, help=f"{name} a task by ID")
+        command.add_argument("id", type=int)
+
+    update = commands.add_parser("update", help="change a task's title and/or description")
+    update.add_argument("id", type=int)
+    update.add_argument("-t", "--title")
+    update.add_argument("-d", "--description")
+
+    for name in ("list", "count"):
+        command = commands.add_parser(name, help=f"{name} tasks")
+        status = command.add_mutually_exclusive_group()
+        status.add_argument("--completed", action="store_const", const=True, dest="completed")
+        status.add_argument("--pending", action="store_const", const=False, dest="completed")
+        if name == "list":
+            command.add_argument("--contains", help="only tasks whose title or description contains this text")
+
+    batch = commands.add_parser("batch", help="apply JSON operations, one per line")
+    batch.add_argument("file", nargs="?", default="-", help="operations file (default: stdin)")
+    return parser.parse_args(argv)
+
+def run_command(app: TodoApp, args) -> int:
+    """
+    Run the subcommand in `args` and print its JSON result(s).
+
+    Args:
+        app: The TodoApp to operate on
+        args: Parsed command-line options
+
+    Returns:
+        The process exit status (0 if every operation succeeded)
+    """
+    if args.op == "batch":
+        if args.file == "-":
+            failures = run_batch(app, sys.stdin, sys.stdout)
+        else:
+            with open(args.file, encoding="utf-8") as f:
+                failures = run_batch(app, f, sys.stdout)
+        return 1 if failures else 0
+
+    op = {key: value for key, value in vars(args).items()
+          if key not in ("store", "path") and value is not None}
+    result = execute(app, op)
+    sys.stdout.write(encode(result))
+    return 0 if result["ok"] else 1
+
+def main(argv=None):
     """
     Main function to run the console-based todo application.
     """
-    app = TodoApp()
-    
+    args = parse_args(argv)
+    app = TodoApp(open_store(args.store, args.path))
+    try:
+        if args.op is None:
+            run(app)
+            return 0
+        return run_command(app, args)
+    finally:
+        app.close()
+
+def run(app: TodoApp):
+    """
+    Run the interactive menu loop until the user exits.
+
+    Args:
+        app: The TodoApp to operate on
+    """
     while True:
         display_menu()
         
@@ -127,6 +216,7 @@ def main():
                 continue
             
             if app.toggle_task_completion(task_id):
+                task = app.get_task(task_id)  # persistent stores return copies
                 status = "completed" if task.completed else "incomplete"
                 print(f"Task with ID {task_id} marked as {status}.")
             else:
@@ -141,4 +231,4 @@ def main():
             print("Invalid choice. Please enter a number between 1 and 6.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -3,10 +3,13 @@ Task model definition for the Todo application.
 """
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """
     Represents a task in the todo list.
+
+    Uses __slots__ so each task has no per-instance __dict__, which keeps
+    large task lists compact in memory.
     
     Attributes:
         id: Integer, unique identifier for the task
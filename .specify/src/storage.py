@@ -0,0 +1,431 @@
+"""
+Task storage backends for TodoApp.
+
+- MemoryStore: tasks live only in memory (the default; lost on exit).
+- JournalStore: MemoryStore plus an append-only journal file. Every change
+  is one appended line, and the journal is compacted into a snapshot once
+  it grows past the live task count. Startup loads the snapshot and
+  replays the journal written since.
+- SqliteStore: tasks stay in a SQLite file (memory-mapped, WAL mode) and
+  are read on demand, so large task sets are not loaded up front.
+
+All backends use only the standard library.
+"""
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from models import Task
+
+class MemoryStore:
+    """
+    Tasks in a dict keyed by ID, with secondary indexes by status.
+
+    Dicts keep insertion order, so tasks are listed in the order they were
+    added, while lookup, update and delete by ID are O(1). Two ordered ID
+    sets hold completed and pending tasks, so filtering by status and
+    counting never scan the whole store.
+    """
+    def __init__(self):
+        """
+        Initialize an empty store.
+        """
+        self.tasks: Dict[int, Task] = {}
+        # completed -> ordered set of task IDs (dict keys, values unused)
+        self.by_status: Dict[bool, Dict[int, None]] = {True: {}, False: {}}
+        self.next_id: int = 1
+
+    def add(self, title: str, description: str = "") -> Task:
+        """
+        Create a task with the next free ID.
+
+        Args:
+            title: The (already validated) title of the task
+            description: The description of the task
+
+        Returns:
+            The created Task object
+        """
+        task = Task(id=self.next_id, title=title, description=description)
+        self._put(task)
+        return task
+
+    def _put(self, task: Task) -> None:
+        old = self.tasks.get(task.id)
+        if old is not None:
+            del self.by_status[old.completed][task.id]
+        self.tasks[task.id] = task
+        self.by_status[task.completed][task.id] = None
+        self.next_id = max(self.next_id, task.id + 1)
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """
+        Get a task by its ID, or None if it does not exist.
+        """
+        return self.tasks.get(task_id)
+
+    def update(self, task_id: int, title: str = None, description: str = None,
+               completed: bool = None) -> Optional[Task]:
+        """
+        Change the given fields of a task.
+
+        Args:
+            task_id: The ID of the task to update
+            title: New title (optional)
+            description: New description (optional)
+            completed: New completion status (optional)
+
+        Returns:
+            The updated Task object, or None if the task was not found
+        """
+        task = self.tasks.get(task_id)
+        if task is None:
+            return None
+
+        if title is not None:
+            task.title = title
+        if description is not None:
+            task.description = description
+        if completed is not None and completed != task.completed:
+            del self.by_status[task.completed][task_id]
+            task.completed = completed
+            self.by_status[completed][task_id] = None
+        return task
+
+    def delete(self, task_id: int) -> bool:
+        """
+        Delete a task by its ID.
+
+        Returns:
+            True if the task was deleted, False if it was not found
+        """
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return False
+
+        del self.by_status[task.completed][task_id]
+        return True
+
+    def list(self, completed: Optional[bool] = None) -> List[Task]:
+        """
+        Get tasks in the order they were added, optionally by status.
+        """
+        if completed is None:
+            return list(self.tasks.values())
+        # Toggling moves an ID to the end of its index; IDs grow with
+        # creation order, so sorting restores it (cheap: mostly sorted).
+        return [self.tasks[task_id] for task_id in sorted(self.by_status[completed])]
+
+    def count(self, completed: Optional[bool] = None) -> int:
+        """
+        Count tasks, optionally only those with the given status.
+        """
+        if completed is None:
+            return len(self.tasks)
+        return len(self.by_status[completed])
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group many changes so the store syncs once at the end.
+
+        Changes made inside are kept even if the block is interrupted;
+        only the durability point moves. Nothing to do in memory.
+        """
+        yield
+
+    def close(self) -> None:
+        """
+        Release any resources held by the store.
+        """
+
+
+class JournalStore(MemoryStore):
+    """
+    MemoryStore persisted as a snapshot plus an append-only journal.
+
+    Files (for path "todo.journal"):
+        todo.journal           one JSON record per change since the snapshot
+        todo.journal.snapshot  the full task set as of the last compaction,
+                               as one JSON array of [id, title, description, completed]
+
+    Both start with a header line carrying a generation number. Compaction
+    writes a new snapshot under the next generation (temp file, fsync,
+    atomic rename) and only then starts a new journal. If the program dies
+    between the two steps, the old journal's generation is lower than the
+    snapshot's and it is skipped on load. A partially written last record
+    (crash mid-append) is dropped and truncated away.
+    """
+    # Compact once the journal holds more records than this, or more than
+    # there are live tasks, whichever is larger.
+    COMPACT_MIN_RECORDS = 10000
+
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        Open (or create) the journal at `path` and load its tasks.
+
+        Args:
+            path: Journal file path; the snapshot sits next to it
+            fsync: Flush every change to disk before returning
+        """
+        super().__init__()
+        self.path = path
+        self.snapshot_path = path + ".snapshot"
+        self.fsync = fsync
+        self.generation = 0
+        self.records = 0
+        self._load_snapshot()
+        self._replay_journal()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self.records == 0 and self._file.tell() == 0:
+            self._write_line({"generation": self.generation})
+
+    # ---------- loading ----------
+
+    def _load_snapshot(self) -> None:
+        if not os.path.exists(self.snapshot_path):
+            return
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            # One json.loads over the whole array is over twice as fast as
+            # a call per task, and the indexes are built in bulk.
+            rows = json.loads(f.readline())
+        self.generation = header["generation"]
+        self.tasks = {row[0]: Task(*row) for row in rows}
+        for task_id, task in self.tasks.items():
+            self.by_status[task.completed][task_id] = None
+        self.next_id = max(self.next_id, header["next_id"])
+
+    def _replay_journal(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            good = 0  # byte offset after the last complete record
+            header = None
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn final write
+                record = json.loads(raw)
+                good += len(raw)
+                if header is None:
+                    header = record
+                    if header["generation"] < self.generation:
+                        break  # superseded by the snapshot
+                    continue
+                self._apply(record)
+                self.records += 1
+
+        if header is not None and header["generation"] < self.generation:
+            os.remove(self.path)  # a fresh journal is started below
+            self.records = 0
+        elif good < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def _apply(self, record: dict) -> None:
+        op = record["op"]
+        if op == "add":
+            self._put(Task(record["id"], record["title"], record["description"], False))
+        elif op == "update":
+            fields = {key: record[key] for key in ("title", "description", "completed") if key in record}
+            super().update(record["id"], **fields)
+        elif op == "delete":
+            super().delete(record["id"])
+
+    # ---------- writing ----------
+
+    def _write_line(self, record: dict) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _append(self, record: dict) -> None:
+        self._write_line(record)
+        self.records += 1
+        if self.records > max(self.COMPACT_MIN_RECORDS, len(self.tasks)):
+            self.compact()
+
+    def add(self, title: str, description: str = "") -> Task:
+        task = super().add(title, description)
+        self._append({"op": "add", "id": task.id, "title": task.title, "description": task.description})
+        return task
+
+    def update(self, task_id: int, title: str = None, description: str = None,
+               completed: bool = None) -> Optional[Task]:
+        task = super().update(task_id, title, description, completed)
+        if task is not None:
+            record = {"op": "update", "id": task_id}
+            for key, value in (("title", title), ("description", description), ("completed", completed)):
+                if value is not None:
+                    record[key] = value
+            self._append(record)
+        return task
+
+    def delete(self, task_id: int) -> bool:
+        deleted = super().delete(task_id)
+        if deleted:
+            self._append({"op": "delete", "id": task_id})
+        return deleted
+
+    @contextmanager
+    def transaction(self):
+        fsync, self.fsync = self.fsync, False
+        try:
+            yield
+        finally:
+            self.fsync = fsync
+            if fsync and not self._file.closed:
+                os.fsync(self._file.fileno())
+
+    def compact(self) -> None:
+        """
+        Write all tasks to a new snapshot and start an empty journal.
+        """
+        generation = self.generation + 1
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"generation": generation, "next_id": self.next_id}) + "\n")
+            f.write(json.dumps(
+                [[task.id, task.title, task.description, task.completed] for task in self.tasks.values()],
+                separators=(",", ":"),
+            ) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._fsync_directory()
+
+        self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self.generation = generation
+        self.records = 0
+        self._write_line({"generation": generation})
+
+    def _fsync_directory(self) -> None:
+        # Makes the rename itself durable (POSIX; not possible on Windows)
+        if os.name != "posix":
+            return
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class SqliteStore:
+    """
+    Tasks kept in a SQLite database and read on demand.
+
+    Nothing is loaded at startup: lookups go through the primary key and
+    status filters and counts through an index on (completed, id). The
+    database file is memory-mapped, so hot pages are served from the OS
+    page cache without copying. Each change is its own committed
+    transaction; WAL journaling makes that an append to the log.
+    """
+    MMAP_BYTES = 256 * 1024 * 1024
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the database at `path`.
+        """
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None)  # autocommit
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"PRAGMA mmap_size={self.MMAP_BYTES}")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS task (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL DEFAULT '',
+                completed INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS ix_task_completed ON task (completed, id);
+        """)
+
+    @staticmethod
+    def _task(row) -> Task:
+        task_id, title, description, completed = row
+        return Task(task_id, title, description, bool(completed))
+
+    def add(self, title: str, description: str = "") -> Task:
+        cursor = self.db.execute(
+            "INSERT INTO task (title, description) VALUES (?, ?)", (title, description)
+        )
+        return Task(cursor.lastrowid, title, description)
+
+    def get(self, task_id: int) -> Optional[Task]:
+        row = self.db.execute(
+            "SELECT id, title, description, completed FROM task WHERE id = ?", (task_id,)
+        ).fetchone()
+        return self._task(row) if row else None
+
+    def update(self, task_id: int, title: str = None, description: str = None,
+               completed: bool = None) -> Optional[Task]:
+        fields = {"title": title, "description": description, "completed": completed}
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if fields:
+            assignments = ", ".join(f"{key} = ?" for key in fields)
+            self.db.execute(f"UPDATE task SET {assignments} WHERE id = ?", (*fields.values(), task_id))
+        return self.get(task_id)
+
+    def delete(self, task_id: int) -> bool:
+        return self.db.execute("DELETE FROM task WHERE id = ?", (task_id,)).rowcount > 0
+
+    def iter(self, completed: Optional[bool] = None) -> Iterator[Task]:
+        """
+        Yield tasks in ID order without materializing them all.
+        """
+        if completed is None:
+            rows = self.db.execute("SELECT id, title, description, completed FROM task ORDER BY id")
+        else:
+            rows = self.db.execute(
+                "SELECT id, title, description, completed FROM task WHERE completed = ? ORDER BY id",
+                (int(completed),),
+            )
+        return map(self._task, rows)
+
+    def list(self, completed: Optional[bool] = None) -> List[Task]:
+        return list(self.iter(completed))
+
+    def count(self, completed: Optional[bool] = None) -> int:
+        if completed is None:
+            return self.db.execute("SELECT COUNT(*) FROM task").fetchone()[0]
+        return self.db.execute("SELECT COUNT(*) FROM task WHERE completed = ?", (int(completed),)).fetchone()[0]
+
+    @contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self.db.execute("COMMIT")
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def open_store(kind: str = "memory", path: Optional[str] = None):
+    """
+    Create a store by name: "memory", "journal" or "sqlite".
+
+    Args:
+        kind: Backend name
+        path: File for the journal/sqlite backends (defaults next to the CWD)
+
+    Returns:
+        The opened store
+    """
+    if kind == "memory":
+        return MemoryStore()
+    if kind == "journal":
+        return JournalStore(path or "todo.journal")
+    if kind == "sqlite":
+        return SqliteStore(path or "todo.db")
+    raise ValueError(f"Unknown store: {kind}")
@@ -2,115 +2,128 @@
 TodoApp class implementation for managing tasks.
 """
 from models import Task
+from storage import MemoryStore
 from typing import List, Optional
 
 class TodoApp:
     """
-    Todo application class that manages tasks in memory.
+    Todo application class that manages tasks.
+
+    Tasks are kept by a store from storage.py: in memory by default, or
+    persisted through a journal or SQLite file. TodoApp validates input and
+    the store does the bookkeeping; every store looks up, updates and
+    deletes by ID without scanning.
     """
-    def __init__(self):
+    def __init__(self, store=None):
         """
-        Initialize the TodoApp with an empty task list and a counter for IDs.
+        Initialize the TodoApp.
+
+        Args:
+            store: Task store to use (defaults to an empty MemoryStore)
         """
-        self.tasks: List[Task] = []
-        self.next_id: int = 1
-    
+        self.store = store if store is not None else MemoryStore()
+
     def add_task(self, title: str, description: str = "") -> Optional[Task]:
         """
         Add a new task with the given title and optional description.
-        
+
         Args:
             title: The title of the task (required, non-empty)
             description: The description of the task (optional)
-            
+
         Returns:
             The created Task object, or None if title is empty
         """
         if not title or not title.strip():
             return None
-        
-        task = Task(id=self.next_id, title=title.strip(), description=description.strip())
-        self.tasks.append(task)
-        self.next_id += 1
-        return task
-    
-    def list_tasks(self) -> List[Task]:
-        """
-        Get a list of all tasks.
-        
+
+        return self.store.add(title.strip(), description.strip())
+
+    def list_tasks(self, completed: Optional[bool] = None) -> List[Task]:
+        """
+        Get a list of tasks in the order they were added.
+
+        Args:
+            completed: If given, only tasks with this completion status
+
+        Returns:
+            A list of Task objects
+        """
+        return self.store.list(completed)
+
+    def count_tasks(self, completed: Optional[bool] = None) -> int:
+        """
+        Count tasks, optionally only those with the given completion status.
+
+        Args:
+            completed: If given, only count tasks with this completion status
+
         Returns:
-            A list of all Task objects
+            The number of matching tasks
         """
-        return self.tasks
-    
+        return self.store.count(completed)
+
     def get_task(self, task_id: int) -> Optional[Task]:
         """
         Get a specific task by its ID.
-        
+
         Args:
             task_id: The ID of the task to retrieve
-            
+
         Returns:
             The Task object if found, None otherwise
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
-    
+        return self.store.get(task_id)
+
     def update_task(self, task_id: int, title: str = None, description: str = None) -> bool:
         """
         Update an existing task with new title and/or description.
-        
+
         Args:
             task_id: The ID of the task to update
             title: New title for the task (optional)
             description: New description for the task (optional)
-            
+
         Returns:
             True if the task was updated, False if task was not found
         """
-        task = self.get_task(task_id)
-        if task is None:
-            return False
-        
         if title is not None:
-            task.title = title.strip()
+            title = title.strip()
         if description is not None:
-            task.description = description.strip()
-        
-        return True
-    
+            description = description.strip()
+
+        return self.store.update(task_id, title=title, description=description) is not None
+
     def delete_task(self, task_id: int) -> bool:
         """
         Delete a task by its ID.
-        
+
         Args:
             task_id: The ID of the task to delete
-            
+
         Returns:
             True if the task was deleted, False if task was not found
         """
-        task = self.get_task(task_id)
-        if task is None:
-            return False
-        
-        self.tasks.remove(task)
-        return True
-    
+        return self.store.delete(task_id)
+
     def toggle_task_completion(self, task_id: int) -> bool:
         """
         Toggle the completion status of a task.
-        
+
         Args:
             task_id: The ID of the task to toggle
-            
+
         Returns:
             True if the task status was toggled, False if task was not found
         """
         task = self.get_task(task_id)
         if task is None:
             return False
-        
-        task.completed = not task.completed
-        return True
\ No newline at end of file
+
+        return self.store.update(task_id, completed=not task.completed) is not None
+
+    def close(self) -> None:
+        """
+        Close the underlying store (flushes and releases files).
+        """
+        self.store.close()
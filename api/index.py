@@ -1,5 +1,3 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 import sys
 from pathlib import Path
@@ -8,17 +6,13 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent / "backend"
 sys.path.insert(0, str(backend_path))
 
-# Import FastAPI app
+# Import FastAPI app (CORS and routes are configured in app.main)
 from app.main import app
 
-# Ensure CORS is configured
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Vercel handler
-handler = Mangum(app)
\ No newline at end of file
+# Vercel handler.
+# lifespan="off": Mangum would otherwise run startup/shutdown around every
+# invocation, creating the schema each time and disposing the engine (and
+# its connections) before the next warm request could reuse them. The engine
+# is created lazily on first DB use and lives as long as the container;
+# the schema is migrated at deploy time with `python -m app.migrate upgrade`.
+handler = Mangum(app, lifespan="off")
@@ -1,55 +1,52 @@
 import logging
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
 
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy import text
+from dotenv import load_dotenv
 import os
 
-# ✅ ROUTES IMPORT (ONLY THIS)
-from app.routes import auth, tasks
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Database URL fix for serverless
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./todo_app.db")
-
-# Handle different database types for serverless environment
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
-elif DATABASE_URL.startswith("sqlite:///"):
-    # Use aiosqlite for SQLite in async context
-    DATABASE_URL = DATABASE_URL.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
-
-# Create async engine
-engine: AsyncEngine = create_async_engine(DATABASE_URL, echo=True)
+# Fall back to a local SQLite database when no DATABASE_URL is configured.
+# Must run before app.* is imported so the shared engine picks it up.
+load_dotenv()
+if not os.environ.get("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///./todo_app.db"
+    # The local fallback database migrates itself
+    os.environ.setdefault("DB_MIGRATE_ON_STARTUP", "true")
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(engine) as session:
-        yield session
+# ✅ ROUTES IMPORT (ONLY THIS)
+from app.routes import auth, tasks, search, bulk, sync, events, metrics, transfer
+from app.config import settings
+from app.database import dispose_engines, get_engine
+from app.migrate import upgrade, verify
+from app.events import start_events, stop_events
+from app.metrics import MetricsMiddleware
+from app.ratelimit import RateLimitMiddleware
 
 
-# Lifespan (create tables)
+# Lifespan (check schema version; `python -m app.migrate upgrade` migrates)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    engine = get_engine()
     try:
-        # Create tables
-        async with engine.begin() as conn:
-            await conn.run_sync(SQLModel.metadata.create_all)
-        logger.info("Database tables created successfully")
+        if settings.DB_MIGRATE_ON_STARTUP:
+            version = await upgrade(engine)
+            logger.info("Database schema at version %d", version)
+        else:
+            await verify(engine)
+        await start_events(engine)
         yield
+        await stop_events()
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
     finally:
-        await engine.dispose()
+        await dispose_engines()
         logger.info("Database engine disposed")
 
 
@@ -62,6 +59,9 @@ app = FastAPI(
     debug=True
 )
 
+# Rate limiting (added before CORS so 429s still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS - More restrictive for production
 app.add_middleware(
     CORSMiddleware,
@@ -69,13 +69,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    # Allow credentials to be sent with cross-origin requests
-    allow_credentials=True,
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Retry-After"],
 )
 
+# Per-request latency, SQL and hashing time (Server-Timing + /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Routes
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(tasks.router, prefix="/api", tags=["tasks"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(bulk.router, prefix="/api", tags=["bulk"])
+app.include_router(sync.router, prefix="/api", tags=["sync"])
+app.include_router(events.router, prefix="/api", tags=["events"])
+app.include_router(transfer.router, prefix="/api", tags=["transfer"])
+app.include_router(metrics.router)
 
 @app.get("/")
 async def root():
@@ -85,10 +93,9 @@ async def root():
 async def health_check():
     """Health check endpoint to verify the API is running"""
     try:
-        # Simple check - try to connect to DB
-        async with AsyncSession(engine) as session:
-            # Just return success if we can get a session
-            pass
+        # Round-trip through the shared pool
+        async with get_engine().connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
@@ -1,68 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from .. import crud, models, schemas
-from ..database import get_session
-from ..auth import get_current_user
-from datetime import timedelta
-from ..config import settings
+from ... import crud, events, schemas
+from ...database import get_session
+from ...auth import verify_token
+from ...routes.tasks import event_payload
 
 
 router = APIRouter()
 
 
 @router.post("/tasks/", response_model=schemas.TaskResponse)
-def create_task(
+async def create_task(
     task: schemas.TaskCreate,
-    current_user: models.User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    user_id: int = Depends(verify_token),
+    session: AsyncSession = Depends(get_session)
 ):
-    return crud.create_task_for_user(session, task, current_user.id)
+    row = await crud.create_task_for_user(session, task, user_id)
+    if row is None:
+        raise HTTPException(status_code=400, detail="Invalid list ID")
+    await session.commit()
+    await events.publish(user_id, "task.created", event_payload(schemas.TaskResponse, row))
+    return row._mapping
 
 
 @router.get("/tasks/", response_model=List[schemas.TaskResponse])
-def read_tasks(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: models.User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+async def read_tasks(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    user_id: int = Depends(verify_token),
+    session: AsyncSession = Depends(get_session)
 ):
-    tasks = crud.get_tasks_by_user_id(session, current_user.id, skip=skip, limit=limit)
-    return tasks
+    rows = await crud.get_tasks_by_user_id(session, user_id, skip=skip, limit=limit)
+    return [row._mapping for row in rows]
 
 
 @router.get("/tasks/{task_id}", response_model=schemas.TaskResponse)
-def read_task(
+async def read_task(
     task_id: int,
-    current_user: models.User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    user_id: int = Depends(verify_token),
+    session: AsyncSession = Depends(get_session)
 ):
-    task = crud.get_task_by_id(session, task_id, current_user.id)
+    task = await crud.get_task_by_id(session, task_id, user_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return task._mapping
 
 
 @router.put("/tasks/{task_id}", response_model=schemas.TaskResponse)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: schemas.TaskUpdate,
-    current_user: models.User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    user_id: int = Depends(verify_token),
+    session: AsyncSession = Depends(get_session)
 ):
-    task = crud.update_task(session, task_id, task_update, current_user.id)
+    task = await crud.update_task(session, task_id, task_update, user_id)
     if not task:
+        if task_update.list_id and await crud.task_exists(session, task_id, user_id):
+            raise HTTPException(status_code=400, detail="Invalid list ID")
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    await session.commit()
+    await events.publish(user_id, "task.updated", event_payload(schemas.TaskResponse, task))
+    return task._mapping
 
 
 @router.delete("/tasks/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    current_user: models.User = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    user_id: int = Depends(verify_token),
+    session: AsyncSession = Depends(get_session)
 ):
-    success = crud.delete_task(session, task_id, current_user.id)
+    success = await crud.delete_task(session, task_id, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
-    return {"message": "Task deleted successfully"}
\ No newline at end of file
+    await session.commit()
+    await events.publish(user_id, "task.deleted", {"id": task_id})
+    return {"message": "Task deleted successfully"}
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session
-from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import timedelta
 from .. import schemas, crud
 from ..database import get_session
-from ..auth import get_current_user, create_access_token, verify_password
+from ..auth import create_access_token
+from ..hashing import verify_password
 from .routes import tasks
-from ..models import User
 from ..config import settings
 
 
@@ -17,31 +16,34 @@ router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 
 
 @router.post("/auth/register", response_model=schemas.UserResponse)
-def register(user: schemas.UserCreate, session: Session = Depends(get_session)):
-    # Check if user already exists
-    db_user = crud.get_user_by_username(session, username=user.username)
-    if db_user:
-        raise HTTPException(status_code=400, detail="Username already registered")
-
-    db_user = crud.get_user_by_email(session, email=user.email)
+async def register(user: schemas.UserCreate, session: AsyncSession = Depends(get_session)):
+    # Check if user already exists (one query for both constraints)
+    db_user = await crud.get_user_by_username_or_email(session, user.username, user.email)
     if db_user:
+        if db_user.username == user.username:
+            raise HTTPException(status_code=400, detail="Username already registered")
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    return crud.create_user(session, user)
+    db_user = await crud.create_user(session, user)
+    if db_user is None:
+        raise HTTPException(status_code=400, detail="Username or email already registered")
+    await session.commit()
+    return db_user._mapping
 
 
 @router.post("/auth/login", response_model=schemas.Token)
-def login(username: str, password: str, session: Session = Depends(get_session)):
-    user = crud.get_user_by_username(session, username=username)
-    if not user or not verify_password(password, user.hashed_password):
+async def login(username: str, password: str, session: AsyncSession = Depends(get_session)):
+    user = await crud.get_user_by_username(session, username=username)
+    if not user or not await verify_password(password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Same claims as /api/auth/login, so v1 tokens work on both APIs
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": str(user.id), "username": user.username}, expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
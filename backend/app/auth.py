@@ -0,0 +1,194 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import JWTError, jwt
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.database import get_engine, read_engine
+from app.models import User
+
+# JWT config
+SECRET_KEY = settings.BETTER_AUTH_SECRET
+if not SECRET_KEY:
+    raise RuntimeError("BETTER_AUTH_SECRET not set")
+
+ALGORITHM = settings.ALGORITHM
+
+security = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller, built from token claims alone (no DB lookup)."""
+    user_id: int
+    username: Optional[str]
+    token_id: Optional[str]
+    issued_at: float
+    expires_at: float
+
+
+class PrincipalCache:
+    """Bounded LRU of verified token -> Principal.
+
+    Entries live for at most `ttl` seconds and never past the token's own
+    expiry. Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[Principal, float]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        principal, expires = entry
+        if expires <= time.time():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return principal
+
+    def put(self, token: str, principal: Principal) -> None:
+        expires = min(time.time() + self.ttl, principal.expires_at)
+        self._entries[token] = (principal, expires)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard(self, predicate) -> None:
+        for token in [t for t, (p, _) in self._entries.items() if predicate(p)]:
+            del self._entries[token]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+class ActiveUsers:
+    """User ids recently confirmed to exist and be active.
+
+    Token claims cannot show that an account was deleted or disabled, so
+    each user is re-checked (one primary-key lookup) once its entry is
+    `ttl` seconds old; that bounds how long such a user keeps access. Only
+    touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._checked: "OrderedDict[int, float]" = OrderedDict()
+
+    def fresh(self, user_id: int) -> bool:
+        checked = self._checked.get(user_id)
+        if checked is None or checked + self.ttl <= time.time():
+            return False
+        self._checked.move_to_end(user_id)
+        return True
+
+    def mark(self, user_id: int) -> None:
+        self._checked[user_id] = time.time()
+        self._checked.move_to_end(user_id)
+        while len(self._checked) > self.maxsize:
+            self._checked.popitem(last=False)
+
+    def clear(self) -> None:
+        self._checked.clear()
+
+
+active_users = ActiveUsers(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+# Revocation state (per process; pair with short token lifetimes).
+_revoked_tokens: Dict[str, float] = {}      # jti -> token expiry
+
+
+def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
+    to_encode = data.copy()
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=15))
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def _is_revoked(principal: Principal) -> bool:
+    return bool(principal.token_id) and principal.token_id in _revoked_tokens
+
+
+def authenticate(token: str) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            principal = Principal(
+                user_id=int(payload["sub"]),
+                username=payload.get("username"),
+                token_id=payload.get("jti"),
+                issued_at=float(payload.get("iat", 0)),
+                expires_at=float(payload["exp"]),
+            )
+        except (JWTError, KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=401, detail="Invalid token")
+        if _is_revoked(principal):
+            raise HTTPException(status_code=401, detail="Token revoked")
+        principal_cache.put(token, principal)
+    return principal
+
+
+def revoke_token(principal: Principal) -> None:
+    if not principal.token_id:
+        return  # legacy token without jti; it simply runs out
+    now = time.time()
+    _revoked_tokens[principal.token_id] = principal.expires_at
+    # Forget revocations whose tokens have expired anyway
+    for jti in [j for j, exp in _revoked_tokens.items() if exp <= now]:
+        del _revoked_tokens[jti]
+    principal_cache.discard(lambda p: p.token_id == principal.token_id)
+
+
+async def authenticate_active(token: str) -> Principal:
+    """authenticate(), plus a (cached) check that the user still exists and is active."""
+    principal = authenticate(token)
+    if not active_users.fresh(principal.user_id):
+        async with get_engine().connect() as conn:
+            active = (await conn.execute(
+                select(User.is_active).where(User.id == principal.user_id)
+            )).scalar_one_or_none()
+        if not active:
+            raise HTTPException(status_code=401, detail="User not found or inactive")
+        active_users.mark(principal.user_id)
+    return principal
+
+
+# ---------------- DEPENDENCIES ---------------- #
+
+async def get_current_principal(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> Principal:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Authorization header missing")
+    return await authenticate_active(credentials.credentials)
+
+
+async def verify_token(principal: Principal = Depends(get_current_principal)) -> int:
+    return principal.user_id
+
+
+async def get_read_session(
+    user_id: int = Depends(verify_token),
+) -> AsyncGenerator[AsyncSession, None]:
+    """For handlers that only read; must never be used to write."""
+    # Lives here rather than in app.database so the database layer (and the
+    # migration CLI) never needs the JWT secret
+    async with AsyncSession(read_engine(user_id)) as session:
+        yield session
@@ -0,0 +1,284 @@
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import Column, Float, LargeBinary, MetaData, String, Table, delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import settings
+from app.database import choose_backend
+from app.etag import etag_matches, not_modified
+
+logger = logging.getLogger(__name__)
+
+# Per-user cache of serialized GET responses (task and list reads).
+#
+# An entry is the exact body and validator headers a handler produced, keyed
+# by user, namespace and path + query string. Writes never hunt for keys:
+# each (user, namespace) has a generation token stored beside its entries,
+# and every entry records the token it was built under. Invalidating swaps
+# the token, so all of that user's entries in the namespace stop matching at
+# once, on any backend. A lookup fetches token and entry in one call.
+#
+# The token is read before the handler queries, so a write that commits
+# mid-query leaves the new entry tagged with the old token: never served.
+#
+# Every write route publishes an event after it commits; the event broker
+# calls invalidate_event() from there, which maps the event type to the
+# namespaces it touches. Backends: "memory" is a per-worker LRU bounded by
+# bytes and entries; "postgres" is an UNLOGGED table shared by every worker.
+# Entries expire after RESPONSE_CACHE_TTL_SECONDS either way. Backend errors
+# fail open (the handler queries as if uncached).
+
+TASKS = "tasks"  # task listings and stats
+LISTS = "lists"  # list listing
+
+EVENT_NAMESPACES: Dict[str, Tuple[str, ...]] = {
+    "task.created": (TASKS,),
+    "task.updated": (TASKS,),
+    "task.deleted": (TASKS,),
+    "tasks.changed": (TASKS,),
+    "list.created": (LISTS,),
+    "list.deleted": (LISTS, TASKS),  # its tasks are deleted or detached
+    "import.progress": (LISTS, TASKS),
+}
+ALL_NAMESPACES = (TASKS, LISTS)
+
+# Tokens outlive entries; an expired or evicted token only orphans entries
+GENERATION_TTL_SECONDS = 86400
+
+# Kept out of SQLModel.metadata; created by migration 7.
+cache_entry = Table(
+    "response_cache",
+    MetaData(),
+    Column("key", String(300), primary_key=True),
+    Column("value", LargeBinary, nullable=False),
+    Column("expires_at", Float, nullable=False),  # unix seconds
+)
+
+# Postgres skips WAL for the table: it is only a cache
+POSTGRES_DDL = [
+    "CREATE UNLOGGED TABLE IF NOT EXISTS response_cache ("
+    "key VARCHAR(300) PRIMARY KEY, value BYTEA NOT NULL, expires_at DOUBLE PRECISION NOT NULL)",
+]
+
+
+def generation_key(user_id: int, namespace: str) -> str:
+    return f"{user_id}:{namespace}:gen"
+
+
+def encode_entry(generation: str, headers: dict, body: bytes) -> bytes:
+    return json.dumps({"g": generation, "h": headers}).encode() + b"\n" + body
+
+
+def decode_entry(value: bytes) -> Tuple[str, dict, bytes]:
+    meta, _, body = value.partition(b"\n")
+    meta = json.loads(meta)
+    return meta["g"], meta["h"], body
+
+
+class CacheBackend:
+    async def get_many(self, keys: Sequence[str], now: float) -> Dict[str, bytes]:
+        """Unexpired values for whichever of `keys` are present."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float, now: float) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-worker LRU, bounded by total value bytes and by entry count.
+
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def discard(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self.size -= len(item[1])
+
+    async def get_many(self, keys: Sequence[str], now: float) -> Dict[str, bytes]:
+        found = {}
+        for key in keys:
+            item = self._entries.get(key)
+            if item is None:
+                continue
+            if item[0] <= now:
+                self.discard(key)
+                continue
+            self._entries.move_to_end(key)
+            found[key] = item[1]
+        return found
+
+    async def set(self, key: str, value: bytes, ttl: float, now: float) -> None:
+        self.discard(key)
+        self._entries[key] = (now + ttl, value)
+        self.size += len(value)
+        while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+            _, (_, old) = self._entries.popitem(last=False)
+            self.size -= len(old)
+            self.evictions += 1
+
+
+class PostgresBackend(CacheBackend):
+    """Shared entries: one indexed SELECT per lookup, one UPSERT per store.
+
+    Expired rows are skipped on read and deleted in passing every
+    PRUNE_EVERY stores.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._stores = 0
+
+    async def get_many(self, keys: Sequence[str], now: float) -> Dict[str, bytes]:
+        query = select(cache_entry.c.key, cache_entry.c.value).where(
+            cache_entry.c.key.in_(keys), cache_entry.c.expires_at > now
+        )
+        async with self.engine.connect() as conn:
+            return {key: value for key, value in (await conn.execute(query)).all()}
+
+    async def set(self, key: str, value: bytes, ttl: float, now: float) -> None:
+        statement = pg_insert(cache_entry).values(key=key, value=value, expires_at=now + ttl)
+        statement = statement.on_conflict_do_update(
+            index_elements=[cache_entry.c.key],
+            set_={"value": statement.excluded.value, "expires_at": statement.excluded.expires_at},
+        )
+        self._stores += 1
+        async with self.engine.connect() as conn:
+            await conn.execute(statement)
+            if self._stores % self.PRUNE_EVERY == 0:
+                await conn.execute(delete(cache_entry).where(cache_entry.c.expires_at <= now))
+            await conn.commit()
+
+
+def create_backend() -> CacheBackend:
+    return choose_backend(
+        settings.RESPONSE_CACHE_BACKEND, PostgresBackend,
+        lambda: MemoryBackend(settings.RESPONSE_CACHE_MAX_BYTES, settings.RESPONSE_CACHE_MAX_ENTRIES),
+    )
+
+
+@dataclass
+class Lookup:
+    """One handler's view of the cache: the entry if it hit, else where to store."""
+
+    key: Optional[str] = None  # None: caching is off for this request
+    generation: str = ""
+    headers: Optional[dict] = None
+    body: Optional[bytes] = None
+
+    @property
+    def hit(self) -> bool:
+        return self.body is not None
+
+    def respond(self, request: Request) -> Response:
+        headers = dict(self.headers, **{"x-cache": "hit"})
+        etag = headers.get("etag")
+        if etag and etag_matches(request, etag):
+            return not_modified(headers)
+        return Response(self.body, headers=headers, media_type="application/json")
+
+
+class ResponseCache:
+    def __init__(self):
+        self._backend: Optional[CacheBackend] = None  # see choose_backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    async def lookup(self, request: Request, user_id: int, namespace: str) -> Lookup:
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return Lookup()
+        key = f"{user_id}:{namespace}:{request.url.path}?{request.url.query}"
+        gen_key = generation_key(user_id, namespace)
+        now = time.time()
+        try:
+            found = await self.backend.get_many([gen_key, key], now)
+            generation = found.get(gen_key, b"").decode()
+            if not generation:
+                # First read since the token expired (or ever): start afresh
+                generation = secrets.token_hex(8)
+                await self.backend.set(gen_key, generation.encode(), GENERATION_TTL_SECONDS, now)
+            elif key in found:
+                entry_generation, headers, body = decode_entry(found[key])
+                if entry_generation == generation:
+                    self.hits += 1
+                    return Lookup(key, generation, headers, body)
+        except Exception:
+            logger.exception("Response cache lookup failed; serving uncached")
+            return Lookup()
+        self.misses += 1
+        return Lookup(key, generation)
+
+    async def store(self, lookup: Lookup, response: Response) -> Response:
+        """Keep a freshly built 200 response for `lookup`, then return it."""
+        if lookup.key is None or response.status_code != 200:
+            return response
+        body = response.body
+        if len(body) <= settings.RESPONSE_CACHE_MAX_ENTRY_BYTES:
+            headers = {name: value for name, value in response.headers.items()
+                       if name not in ("content-length", "content-type")}
+            try:
+                await self.backend.set(
+                    lookup.key, encode_entry(lookup.generation, headers, body),
+                    settings.RESPONSE_CACHE_TTL_SECONDS, time.time(),
+                )
+            except Exception:
+                logger.exception("Response cache store failed")
+        response.headers["x-cache"] = "miss"
+        return response
+
+    async def invalidate(self, user_id: int, namespaces: Sequence[str]) -> None:
+        now = time.time()
+        for namespace in namespaces:
+            self.invalidations += 1
+            await self.backend.set(
+                generation_key(user_id, namespace), secrets.token_hex(8).encode(),
+                GENERATION_TTL_SECONDS, now,
+            )
+
+    async def invalidate_event(self, user_id: int, type: str) -> None:
+        """Drop the user's entries that a write announced as `type` affects."""
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return
+        try:
+            await self.invalidate(user_id, EVENT_NAMESPACES.get(type, ALL_NAMESPACES))
+        except Exception:
+            # Entries built before the write stay until they expire
+            logger.exception("Response cache invalidation failed for %s", type)
+
+    def invalidate_local(self, user_id: int, type: str) -> None:
+        """Same, for events from other workers: only a per-worker cache needs it."""
+        backend = self._backend
+        if isinstance(backend, MemoryBackend):
+            # A missing token reads as a fresh one, so dropping it is enough
+            for namespace in EVENT_NAMESPACES.get(type, ALL_NAMESPACES):
+                self.invalidations += 1
+                backend.discard(generation_key(user_id, namespace))
+
+
+response_cache = ResponseCache()
@@ -13,6 +13,71 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Verified-token cache (skips JWT decode on hot paths); the TTL also
+    # sets how often a user's row is re-checked for deletion/deactivation
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 300
+
+    # Password hashing (bcrypt runs off the event loop)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Database engine (one shared pool for every entry point)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg; set 0 behind pgbouncer
+    DB_MIGRATE_ON_STARTUP: bool = False  # else startup only checks the schema version
+
+    # Read replica: read-only handlers use it when set. A user's reads stay
+    # on the primary for this long after their last write (read-your-writes).
+    DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+    DB_REPLICA_STICKY_SECONDS: int = 5
+
+    # Delta sync: changes newer than this are re-sent on the next poll, so a
+    # write that commits after its updated_at stamp is never skipped
+    SYNC_SETTLE_SECONDS: int = 5
+    # Deletions are kept this long; older sync tokens get 410 (full resync)
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Push events (SSE): "memory" for one worker, "postgres" for LISTEN/NOTIFY
+    EVENTS_BACKEND: str = "memory"
+    EVENTS_CHANNEL: str = "task_events"
+    EVENTS_QUEUE_SIZE: int = 100  # per stream; overflow sends "resync"
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Rate limiting (token buckets): "memory" per worker, "postgres" shared.
+    # Authenticated callers are limited per user, others per client IP;
+    # login/register also draw from a stricter per-IP bucket.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_TRUST_PROXY: bool = False  # key on X-Forwarded-For (behind a proxy only)
+    RATE_LIMIT_MEMORY_KEYS: int = 100000
+    RATE_LIMIT_USER_BURST: int = 120
+    RATE_LIMIT_USER_PER_MINUTE: int = 600
+    RATE_LIMIT_IP_BURST: int = 60
+    RATE_LIMIT_IP_PER_MINUTE: int = 300
+    RATE_LIMIT_AUTH_BURST: int = 10
+    RATE_LIMIT_AUTH_PER_MINUTE: int = 20
+
+    # /metrics is served only when a token is set, and only to
+    # "Authorization: Bearer <METRICS_TOKEN>" (e.g. the Prometheus scraper)
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")
+
+    # Response cache for task/list reads: "memory" per worker (LRU), or
+    # "postgres" shared. Writes invalidate the writer's entries immediately;
+    # the TTL bounds anything they can't reach (e.g. replica lag).
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # memory backend, per worker
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024  # larger bodies aren't cached
+
     class Config:
         env_file = ".env"
         extra = "ignore"
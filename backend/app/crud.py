@@ -1,69 +1,351 @@
-from sqlmodel import Session, select
-from typing import Optional
-from datetime import datetime
-from .models import User, Task
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, delete, func, insert, literal, tuple_, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .models import User, Task, TaskList
 from .schemas import UserCreate, TaskCreate, TaskUpdate
-from .auth import get_password_hash
+from .hashing import hash_password
+from .serialization import TASK_RESPONSE_COLUMNS
+from .sync import record_deletions
+
+# Shared async data access for the /api routers and the legacy v1 API.
+# Helpers run in the caller's transaction and never commit: routes commit,
+# then publish push events, so a failed request leaves nothing behind.
+# Writes are Core INSERT/UPDATE/DELETE ... RETURNING on the tables, one
+# statement per mutation with no follow-up refresh(); reads return rows.
+
+task_table = Task.__table__
+list_table = TaskList.__table__
+
+# Upper bound on ids per IN (...) so large batches stay under driver
+# parameter limits (SQLite: 32766, asyncpg: 32767).
+ID_BATCH_SIZE = 1000
+
+Key = Tuple[datetime, int]
+
+
+def chunked(ids: Iterable[int], size: int = ID_BATCH_SIZE) -> List[List[int]]:
+    ids = list(dict.fromkeys(ids))
+    return [ids[i:i + size] for i in range(0, len(ids), size)]
+
+# ---------- USERS ----------
 
+async def get_user_by_username(session: AsyncSession, username: str) -> Optional[User]:
+    result = await session.execute(select(User).where(User.username == username))
+    return result.scalar_one_or_none()
 
-def get_user_by_username(session: Session, username: str) -> Optional[User]:
-    statement = select(User).where(User.username == username)
-    return session.exec(statement).first()
 
+async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
+    result = await session.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
 
-def get_user_by_email(session: Session, email: str) -> Optional[User]:
-    statement = select(User).where(User.email == email)
-    return session.exec(statement).first()
 
+async def get_user_by_username_or_email(session: AsyncSession, username: str, email: str) -> Optional[User]:
+    statement = select(User).where((User.username == username) | (User.email == email)).limit(1)
+    result = await session.execute(statement)
+    return result.scalar_one_or_none()
 
-def create_user(session: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password
+
+async def create_user(session: AsyncSession, user: UserCreate) -> Optional[Row]:
+    """Insert a user; None if the username or email is already taken."""
+    # Callers check for duplicates first so they don't pay for bcrypt; the
+    # unique constraints still catch a concurrent registration.
+    hashed_password = await hash_password(user.password)
+    user_table = User.__table__
+    statement = (
+        insert(user_table)
+        .values(username=user.username, email=user.email, hashed_password=hashed_password)
+        .returning(*user_table.c)
+    )
+    try:
+        return (await session.execute(statement)).one()
+    except IntegrityError:
+        await session.rollback()
+        return None
+
+# ---------- TASK LISTS ----------
+
+def owned_list(list_id: int, user_id: int):
+    return (
+        select(TaskList.id)
+        .where(TaskList.id == list_id, TaskList.user_id == user_id)
+        .exists()
     )
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-    return db_user
-
-
-def get_tasks_by_user_id(session: Session, user_id: int, skip: int = 0, limit: int = 100):
-    statement = select(Task).where(Task.user_id == user_id).offset(skip).limit(limit)
-    return session.exec(statement).all()
-
-
-def get_task_by_id(session: Session, task_id: int, user_id: int) -> Optional[Task]:
-    statement = select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    return session.exec(statement).first()
-
-
-def create_task_for_user(session: Session, task: TaskCreate, user_id: int) -> Task:
-    db_task = Task(**task.dict(), user_id=user_id)
-    session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
-    return db_task
-
-
-def update_task(session: Session, task_id: int, task_update: TaskUpdate, user_id: int) -> Optional[Task]:
-    db_task = get_task_by_id(session, task_id, user_id)
-    if db_task:
-        update_data = task_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_task, field, value)
-        db_task.updated_at = datetime.utcnow()
-        session.add(db_task)
-        session.commit()
-        session.refresh(db_task)
-    return db_task
-
-
-def delete_task(session: Session, task_id: int, user_id: int) -> bool:
-    db_task = get_task_by_id(session, task_id, user_id)
-    if db_task:
-        session.delete(db_task)
-        session.commit()
-        return True
-    return False
\ No newline at end of file
+
+
+async def owned_list_ids(session: AsyncSession, user_id: int, list_ids: Iterable[int]) -> Set[int]:
+    """The subset of `list_ids` owned by the user, in one query per id batch."""
+    owned: Set[int] = set()
+    for batch in chunked(list_id for list_id in list_ids if list_id):
+        statement = select(TaskList.id).where(TaskList.user_id == user_id, TaskList.id.in_(batch))
+        owned.update((await session.execute(statement)).scalars().all())
+    return owned
+
+
+async def list_collection_version(session: AsyncSession, user_id: int) -> Tuple[int, Optional[int], Optional[datetime]]:
+    """(count, max id, newest created_at) of the user's lists."""
+    # Lists are never edited in place: creates raise max(id), deletes lower
+    # the count.
+    statement = select(
+        func.count(TaskList.id), func.max(TaskList.id), func.max(TaskList.created_at)
+    ).where(TaskList.user_id == user_id)
+    return tuple((await session.execute(statement)).one())
+
+
+async def get_lists(session: AsyncSession, user_id: int) -> Sequence[TaskList]:
+    result = await session.execute(select(TaskList).where(TaskList.user_id == user_id))
+    return result.scalars().all()
+
+
+async def create_list(session: AsyncSession, user_id: int, name: str) -> Optional[Row]:
+    """Insert a list; None if the user already has one with this name."""
+    # Insert only if the name is free for this user, in one statement
+    name_taken = (
+        select(list_table.c.id)
+        .where(list_table.c.user_id == user_id, list_table.c.name == name)
+        .exists()
+    )
+    source = select(
+        literal(name, list_table.c.name.type),
+        literal(user_id, list_table.c.user_id.type),
+        literal(datetime.utcnow(), list_table.c.created_at.type),
+    ).where(~name_taken)
+    statement = (
+        insert(list_table)
+        .from_select(["name", "user_id", "created_at"], source)
+        .returning(*list_table.c)
+    )
+    try:
+        row = (await session.execute(statement)).first()
+    except IntegrityError:
+        row = None  # a concurrent create won the unique (user_id, name) index
+    if row is None:
+        await session.rollback()
+    return row
+
+
+async def delete_list(session: AsyncSession, user_id: int, list_id: int, delete_tasks: bool = False) -> bool:
+    """Delete a list and detach (or delete) its tasks; False if not found."""
+    # Set-based: one statement for the list's tasks and one for the list
+    # itself, regardless of how many tasks it holds.
+    tasks_in_list = (Task.list_id == list_id, Task.user_id == user_id)
+    if delete_tasks:
+        tasks_statement = delete(Task).where(*tasks_in_list).returning(Task.id)
+    else:
+        tasks_statement = (
+            update(Task)
+            .where(*tasks_in_list)
+            .values(list_id=None, updated_at=datetime.utcnow())
+        )
+    result = await session.execute(tasks_statement.execution_options(synchronize_session=False))
+    if delete_tasks:
+        await record_deletions(session, user_id, result.scalars().all())
+
+    list_statement = (
+        delete(TaskList)
+        .where(TaskList.id == list_id, TaskList.user_id == user_id)
+        .returning(TaskList.id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(list_statement)
+    if result.scalar_one_or_none() is None:
+        await session.rollback()
+        return False
+    return True
+
+# ---------- TASK READS ----------
+
+async def task_collection_version(session: AsyncSession, user_id: int) -> Tuple[int, Optional[datetime], Optional[int]]:
+    """(count, newest updated_at, max id) of the user's tasks."""
+    # Every task write stamps updated_at (or is a delete, which lowers the
+    # count), so this one aggregate versions the whole collection.
+    statement = select(
+        func.count(Task.id), func.max(Task.updated_at), func.max(Task.id)
+    ).where(Task.user_id == user_id)
+    return tuple((await session.execute(statement)).one())
+
+
+def task_query(
+    user_id: int,
+    completed: Optional[bool] = None,
+    list_id: Optional[int] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+):
+    """Filtered SELECT of the TaskResponse columns as plain rows."""
+    statement = select(*TASK_RESPONSE_COLUMNS).where(Task.user_id == user_id)
+    if completed is not None:
+        statement = statement.where(Task.completed == completed)
+    if list_id is not None:
+        statement = statement.where(Task.list_id == list_id)
+    if due_from is not None:
+        statement = statement.where(Task.due_date >= due_from)
+    if due_to is not None:
+        statement = statement.where(Task.due_date <= due_to)
+    return statement
+
+
+async def get_task_page(
+    session: AsyncSession,
+    user_id: int,
+    *,
+    completed: Optional[bool] = None,
+    list_id: Optional[int] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    order: Literal["asc", "desc"] = "asc",
+    after: Optional[Key] = None,
+    limit: Optional[int] = None,
+) -> Tuple[List[Row], bool]:
+    """One page of tasks after the (created_at, id) key; (rows, has_more).
+
+    Keyset pagination: resuming from a key is an index seek on the
+    (user_id, ..., created_at, id) indexes, so page N costs the same as
+    page 1. With no limit the whole filtered collection is returned.
+    """
+    statement = task_query(user_id, completed, list_id, due_from, due_to)
+
+    key = tuple_(Task.created_at, Task.id)
+    if after is not None:
+        statement = statement.where(key > tuple_(*after) if order == "asc" else key < tuple_(*after))
+
+    if order == "asc":
+        statement = statement.order_by(Task.created_at, Task.id)
+    else:
+        statement = statement.order_by(Task.created_at.desc(), Task.id.desc())
+
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+
+    rows = (await session.execute(statement)).all()
+    if limit is not None and len(rows) > limit:
+        return rows[:limit], True
+    return rows, False
+
+
+async def get_tasks_by_user_id(session: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Row]:
+    """Offset page in id order, for the v1 skip/limit API.
+
+    OFFSET still reads and discards `skip` rows; new callers should use
+    get_task_page.
+    """
+    statement = task_query(user_id).order_by(Task.id).offset(skip).limit(limit)
+    return (await session.execute(statement)).all()
+
+
+async def get_task_by_id(session: AsyncSession, task_id: int, user_id: int) -> Optional[Row]:
+    statement = task_query(user_id).where(Task.id == task_id)
+    return (await session.execute(statement)).first()
+
+
+async def get_tasks_by_ids(session: AsyncSession, user_id: int, task_ids: Iterable[int]) -> Dict[int, Row]:
+    """Owned tasks among `task_ids`, keyed by id, in one query per id batch."""
+    found: Dict[int, Row] = {}
+    for batch in chunked(task_ids):
+        statement = task_query(user_id).where(Task.id.in_(batch))
+        found.update((row.id, row) for row in (await session.execute(statement)).all())
+    return found
+
+
+async def task_exists(session: AsyncSession, task_id: int, user_id: int) -> bool:
+    statement = select(Task.id).where(Task.id == task_id, Task.user_id == user_id)
+    return (await session.execute(statement)).first() is not None
+
+
+async def get_task_stats(session: AsyncSession, user_id: int, today: date) -> List[Row]:
+    """Per-list (list_id, total, completed, today, upcoming, scheduled) counts."""
+    # One grouped aggregate: a seek on (user_id, list_id) instead of
+    # shipping every task to the client.
+    def count_where(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    statement = (
+        select(
+            Task.list_id,
+            func.count(Task.id),
+            count_where(Task.completed == True),  # noqa: E712
+            count_where(Task.due_date == today),
+            count_where(Task.due_date > today),
+            func.count(Task.due_date),
+        )
+        .where(Task.user_id == user_id)
+        .group_by(Task.list_id)
+    )
+    return (await session.execute(statement)).all()
+
+# ---------- TASK WRITES ----------
+
+async def create_task_for_user(session: AsyncSession, task: TaskCreate, user_id: int) -> Optional[Row]:
+    """Insert a task; None if its list_id isn't one of the user's lists."""
+    now = datetime.utcnow()
+    values = {**task.model_dump(), "user_id": user_id, "created_at": now, "updated_at": now}
+    values["list_id"] = values["list_id"] or None  # 0 or None means no list
+
+    if values["list_id"]:
+        # INSERT ... SELECT ... WHERE <list is owned>: the list check rides
+        # along with the write instead of costing its own round trip.
+        source = select(
+            *[literal(value, task_table.c[name].type).label(name) for name, value in values.items()]
+        ).where(owned_list(values["list_id"], user_id))
+        statement = insert(task_table).from_select(list(values), source)
+    else:
+        statement = insert(task_table).values(values)
+
+    return (await session.execute(statement.returning(*task_table.c))).first()
+
+
+async def update_task(session: AsyncSession, task_id: int, task_update: TaskUpdate, user_id: int) -> Optional[Row]:
+    """Apply the set fields; None if the task or the new list isn't owned."""
+    values = task_update.model_dump(exclude_unset=True)
+    if "list_id" in values:
+        values["list_id"] = values["list_id"] or None  # 0 or None means no list
+
+    # Ownership and list ownership are part of the WHERE clause, so a
+    # successful update is a single UPDATE ... RETURNING.
+    conditions = [task_table.c.id == task_id, task_table.c.user_id == user_id]
+    if values.get("list_id"):
+        conditions.append(owned_list(values["list_id"], user_id))
+
+    statement = (
+        update(task_table)
+        .where(*conditions)
+        .values(**values, updated_at=datetime.utcnow())
+        .returning(*task_table.c)
+    )
+    row = (await session.execute(statement)).first()
+    if row is None:
+        await session.rollback()
+    return row
+
+
+async def delete_task(session: AsyncSession, task_id: int, user_id: int) -> bool:
+    """Delete a task and log it for delta sync; False if not found."""
+    statement = (
+        delete(task_table)
+        .where(task_table.c.id == task_id, task_table.c.user_id == user_id)
+        .returning(task_table.c.id)
+    )
+    if (await session.execute(statement)).first() is None:
+        return False
+    await record_deletions(session, user_id, [task_id])
+    return True
+
+
+async def delete_tasks(session: AsyncSession, user_id: int, task_ids: Iterable[int]) -> Set[int]:
+    """Delete owned tasks among `task_ids`; returns the ids actually deleted."""
+    deleted: Set[int] = set()
+    for batch in chunked(task_ids):
+        statement = (
+            delete(Task)
+            .where(Task.user_id == user_id, Task.id.in_(batch))
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted.update((await session.execute(statement)).scalars().all())
+    await record_deletions(session, user_id, deleted)
+    return deleted
@@ -1,37 +1,176 @@
-from sqlmodel import SQLModel
+import time
+from collections import OrderedDict
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine
-from typing import AsyncGenerator
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Callable, Optional, TypeVar
 
-from app.config import settings
+from app.config import Settings, settings
+from app.metrics import instrument_engine, observe_pool_wait
 
-# Convert postgres URL → asyncpg
-DATABASE_URL = settings.DATABASE_URL
 
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgresql://", "postgresql+asyncpg://", 1
-    )
-elif DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgres://", "postgresql+asyncpg://", 1
+def normalize_database_url(url: str) -> str:
+    url = url.strip("'\"")
+
+    # Convert postgres URL → asyncpg, sqlite → aiosqlite
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif url.startswith("sqlite:///"):
+        url = url.replace("sqlite:///", "sqlite+aiosqlite:///", 1)
+
+    # Remove SSL parameters for asyncpg
+    for param in ("sslmode=require", "channel_binding=require"):
+        if param in url:
+            url = url.replace(f"&{param}", "")
+            url = url.replace(f"{param}&", "")
+            url = url.replace(f"?{param}", "")
+
+    return url
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            observe_pool_wait(time.perf_counter() - started)
+
+
+def create_engine_from_settings(config: Settings = settings, url: Optional[str] = None) -> AsyncEngine:
+    url = normalize_database_url(url or config.DATABASE_URL)
+
+    # SQLite (serverless fallback / local dev) keeps SQLAlchemy's default pool
+    if url.startswith("sqlite"):
+        return create_async_engine(url, echo=config.DB_ECHO)
+
+    connect_args = {
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+    }
+    if config.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS)
+        }
+
+    return create_async_engine(
+        url,
+        echo=config.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_pre_ping=config.DB_POOL_PRE_PING,
+        pool_recycle=config.DB_POOL_RECYCLE,
+        connect_args=connect_args,
     )
 
-# Remove SSL parameters for asyncpg
-if "sslmode=require" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("&sslmode=require", "")
-    DATABASE_URL = DATABASE_URL.replace("sslmode=require&", "")
-    DATABASE_URL = DATABASE_URL.replace("?sslmode=require", "")
-    
-if "channel_binding=require" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("&channel_binding=require", "")
-    DATABASE_URL = DATABASE_URL.replace("channel_binding=require&", "")
-    DATABASE_URL = DATABASE_URL.replace("?channel_binding=require", "")
-
-# Async engine
-engine = create_async_engine(DATABASE_URL, echo=True)
-
-# Dependency
+
+# Async engine (shared by routers, lifespan and health check). Created on
+# first use so importing the app stays cheap on serverless cold starts, then
+# kept for the life of the process so warm invocations reuse its pool.
+_engine: Optional[AsyncEngine] = None
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = create_engine_from_settings()
+        instrument_engine(_engine)
+    return _engine
+
+
+# Optional read replica (DATABASE_REPLICA_URL), created on first use like
+# the primary. Without one every read goes to the primary.
+_replica_engine: Optional[AsyncEngine] = None
+
+
+def get_replica_engine() -> Optional[AsyncEngine]:
+    global _replica_engine
+    if _replica_engine is None and settings.DATABASE_REPLICA_URL:
+        _replica_engine = create_engine_from_settings(url=settings.DATABASE_REPLICA_URL)
+        instrument_engine(_replica_engine)
+    return _replica_engine
+
+
+async def dispose_engines() -> None:
+    global _replica_engine
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+        _replica_engine = None
+    await get_engine().dispose()
+
+
+Backend = TypeVar("Backend")
+
+
+def choose_backend(
+    choice: str, postgres: Callable[[AsyncEngine], Backend], memory: Callable[[], Backend]
+) -> Backend:
+    """Backend for state that workers can share (rate limits, response cache).
+
+    `choice` "postgres" builds it on the primary engine when that is
+    Postgres; anything else, or another dialect, keeps it in this worker's
+    memory. Callers pick on first use rather than at startup, since the
+    Vercel handler runs without lifespan events.
+    """
+    if choice == "postgres":
+        engine = get_engine()
+        if engine.dialect.name == "postgresql":
+            return postgres(engine)
+    return memory()
+
+
+class RecentWriters:
+    """Users who wrote within the last `window` seconds (read-your-writes).
+
+    Reads for these users stay on the primary until the replica has had
+    time to catch up. Deadlines are appended in order, so expired entries
+    are popped from the front. Only touched from the event loop.
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._deadlines: "OrderedDict[int, float]" = OrderedDict()
+        # Marks only cover other workers' writes while the postgres event
+        # listener is connected; app.events keeps this flag current.
+        self.shared = False
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._deadlines[user_id] = now + self.window
+        self._deadlines.move_to_end(user_id)
+        while self._deadlines:
+            oldest, deadline = next(iter(self._deadlines.items()))
+            if deadline > now:
+                break
+            del self._deadlines[oldest]
+
+    def recent(self, user_id: int) -> bool:
+        deadline = self._deadlines.get(user_id)
+        return deadline is not None and deadline > time.monotonic()
+
+
+recent_writers = RecentWriters(settings.DB_REPLICA_STICKY_SECONDS)
+
+
+def read_engine(user_id: int) -> AsyncEngine:
+    """Replica for read-only work, unless the user has just written.
+
+    Without the shared event listener this worker cannot see writes made
+    elsewhere (other workers, serverless instances), so reads stay on the
+    primary.
+    """
+    replica = get_replica_engine()
+    if replica is None or not recent_writers.shared or recent_writers.recent(user_id):
+        return get_engine()
+    return replica
+
+
+# Dependencies
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(engine) as session:
+    async with AsyncSession(get_engine()) as session:
         yield session
@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Conditional GET for per-user collections.
+#
+# A collection's version is read from the database (row count plus the
+# newest write stamp), not kept in process memory, so every worker agrees on
+# it. Writes already stamp updated_at / insert new ids, and deletes lower the
+# count, so any mutation moves the version. The ETag also folds in the query
+# string, since filtered and paginated views of one collection differ.
+#
+# Only If-None-Match is honoured: Last-Modified cannot see deletes, so
+# answering If-Modified-Since with 304 could hide a removed row.
+
+
+def collection_etag(request: Request, *version) -> str:
+    raw = "|".join(str(part) for part in version) + "?" + str(request.query_params)
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # no-cache: browsers keep the body but revalidate on every poll
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(headers: dict) -> Response:
+    # 304 carries the validators but no body; no rows are loaded
+    return Response(status_code=304, headers=headers)
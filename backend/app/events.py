@@ -0,0 +1,239 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+from app.cache import response_cache
+from app.config import settings
+from app.database import recent_writers
+
+logger = logging.getLogger(__name__)
+
+# Per-user change events for push clients.
+#
+# Routes call publish() after they commit. The backend decides how an event
+# reaches every worker; each worker then fans it out to its own subscribers
+# (one bounded queue per open stream). A subscriber that falls too far
+# behind gets its queue replaced by a single "resync" event instead of
+# blocking publishers or growing without bound.
+
+RESYNC = {"type": "resync", "data": {}}
+
+
+class EventBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self.backend: "EventBackend" = MemoryBackend(self)
+        self.reconnects = 0  # backend connections re-established after a loss
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def deliver(self, user_id: int, event: dict) -> None:
+        """Fan an event out to this worker's subscribers for `user_id`."""
+        # Every write route publishes after it commits, so an event is also
+        # this worker's cue to pin the user's reads to the primary (events
+        # from other workers arrive here through the postgres backend).
+        recent_writers.mark(user_id)
+        if not isinstance(self.backend, MemoryBackend):
+            # Possibly another worker's write; publish() already handled ours
+            response_cache.invalidate_local(user_id, event["type"])
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._resync(queue)
+
+    @staticmethod
+    def _resync(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+    def resync_all(self) -> None:
+        """Events may have been lost (backend reconnected): every stream resyncs."""
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._resync(queue)
+
+    async def publish(self, user_id: int, type: str, data: Any) -> None:
+        event = {"type": type, "data": data}
+        recent_writers.mark(user_id)  # before any network hop
+        await response_cache.invalidate_event(user_id, type)
+        try:
+            await self.backend.publish(user_id, event)
+        except Exception:
+            # Push is best effort: the write is committed and clients can
+            # always catch up through /api/tasks/changes.
+            logger.exception("Failed to publish %s event", type)
+
+
+class EventBackend:
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(EventBackend):
+    """Single worker: deliver straight to local subscribers."""
+
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        self.broker.deliver(user_id, event)
+
+
+class PostgresNotifyBackend(EventBackend):
+    """Multi-worker: NOTIFY on one channel, every worker LISTENs.
+
+    Holds one pooled connection per worker for the life of the app. Events
+    published by this worker also arrive through the listener, so local
+    delivery happens only there. NOTIFY payloads are capped at 8000 bytes,
+    which a single task comfortably fits in.
+
+    A watcher task pings the connection every EVENTS_HEARTBEAT_SECONDS and
+    wakes early when asyncpg reports it closed (database restart, proxy
+    idle timeout). A lost connection is replaced, retrying with backoff,
+    and every local stream is told to resync: events sent while nobody
+    was listening are gone.
+    """
+
+    MAX_RETRY_SECONDS = 30.0
+
+    def __init__(self, broker: EventBroker, engine, channel: str):
+        self.broker = broker
+        self.engine = engine
+        self.channel = channel
+        self._conn = None
+        self._driver = None
+        self._lock = asyncio.Lock()  # one statement at a time on the connection
+        self._lost = asyncio.Event()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        await self._listen()
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        recent_writers.shared = False
+        if self._conn is not None:
+            self._driver.remove_termination_listener(self._on_terminate)
+            await self._driver.remove_listener(self.channel, self._on_notify)
+            await self._conn.close()
+            self._conn = self._driver = None
+
+    async def _listen(self) -> None:
+        conn = await self.engine.connect()
+        try:
+            raw = await conn.get_raw_connection()
+            driver = raw.driver_connection
+            await driver.add_listener(self.channel, self._on_notify)
+            driver.add_termination_listener(self._on_terminate)
+        except Exception:
+            await conn.invalidate()
+            raise
+        self._conn, self._driver = conn, driver
+        recent_writers.shared = True
+
+    def _on_terminate(self, connection) -> None:
+        self._lost.set()
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), settings.EVENTS_HEARTBEAT_SECONDS)
+                logger.warning("Event listener connection closed; reconnecting")
+            except asyncio.TimeoutError:
+                try:
+                    async with self._lock:
+                        await self._driver.execute("SELECT 1", timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+                    continue
+                except Exception:
+                    logger.warning("Event listener connection failed its ping; reconnecting", exc_info=True)
+            await self._reconnect()
+
+    async def _reconnect(self) -> None:
+        recent_writers.shared = False  # writes elsewhere go unseen until we listen again
+        async with self._lock:  # let an in-flight NOTIFY finish first
+            conn, driver = self._conn, self._driver
+            self._conn = self._driver = None
+        self._lost.clear()
+        try:
+            driver.remove_termination_listener(self._on_terminate)
+            await conn.invalidate()  # never hand a dead connection back to the pool
+        except Exception:
+            logger.debug("Discarding the old listener connection failed", exc_info=True)
+
+        delay = 1.0
+        while True:
+            try:
+                await self._listen()
+                break
+            except Exception:
+                logger.exception("Event listener reconnect failed; retrying in %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RETRY_SECONDS)
+        self.broker.reconnects += 1
+        logger.info("Event listener reconnected")
+        self.broker.resync_all()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        message = json.loads(payload)
+        self.broker.deliver(message["user_id"], message["event"])
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        payload = json.dumps({"user_id": user_id, "event": event}, default=str)
+        async with self._lock:
+            if self._driver is None:
+                # Don't hold up the write; broker.publish logs this
+                raise ConnectionError("Event listener is reconnecting")
+            await self._driver.execute(
+                "SELECT pg_notify($1, $2)", self.channel, payload, timeout=settings.EVENTS_HEARTBEAT_SECONDS
+            )
+
+
+broker = EventBroker(settings.EVENTS_QUEUE_SIZE)
+
+
+async def start_events(engine) -> None:
+    shared = settings.EVENTS_BACKEND == "postgres" and engine.dialect.name == "postgresql"
+    if settings.DATABASE_REPLICA_URL and not shared:
+        # Read-your-writes needs every worker to hear about every write
+        raise RuntimeError("DATABASE_REPLICA_URL requires EVENTS_BACKEND=postgres on a Postgres primary")
+    if shared:
+        broker.backend = PostgresNotifyBackend(broker, engine, settings.EVENTS_CHANNEL)
+    await broker.backend.start()
+
+
+async def stop_events() -> None:
+    await broker.backend.stop()
+
+
+async def publish(user_id: int, type: str, data: Any = None) -> None:
+    await broker.publish(user_id, type, data)
+
+
+def encode_sse(event: Optional[dict]) -> str:
+    if event is None:
+        return ": ping\n\n"  # comment line keeps proxies from timing out
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
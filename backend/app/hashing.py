@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from functools import lru_cache
+
+from fastapi import HTTPException
+
+from app.config import settings
+from app.metrics import observe_hash
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    # Built on first use, inside a worker thread: loading passlib and the
+    # bcrypt backend is a large share of a cold import otherwise.
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    )
+
+
+def _hash(password: str) -> str:
+    return pwd_context().hash(password)
+
+
+def _verify(plain: str, hashed: str) -> bool:
+    return pwd_context().verify(plain, hashed)
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so worker threads hash in parallel while the
+    event loop keeps serving other requests. At most `max_pending` calls may
+    be queued or running; beyond that callers get a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()  # guards the counters workers touch
+        self.pending = 0        # queued + running
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds = 0.0  # time spent inside bcrypt
+        self.wait_seconds = 0.0  # time spent queued for a worker
+
+    def _timed(self, submitted: float, fn, *args):
+        started = time.perf_counter()
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.running -= 1
+                self.wait_seconds += started - submitted
+                self.hash_seconds += finished - started
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._timed, submitted, fn, *args
+            )
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            observe_hash(time.perf_counter() - submitted)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queued": self.pending - self.running,
+            "running": self.running,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds": self.hash_seconds,
+            "wait_seconds": self.wait_seconds,
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.run(_hash, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await password_hasher.run(_verify, plain, hashed)
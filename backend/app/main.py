@@ -1,52 +1,29 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import SQLModel
-from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
-from jose import JWTError, jwt
 
 # ✅ ROUTES IMPORT (ONLY THIS)
-from app.routes import auth, tasks
+from app.routes import auth, tasks, search, bulk, sync, events, metrics, transfer
 from app.config import settings
+from app.database import dispose_engines, get_engine
+from app.migrate import upgrade, verify
+from app.events import start_events, stop_events
+from app.metrics import MetricsMiddleware
+from app.ratelimit import RateLimitMiddleware
 
-# Database URL fix
-DATABASE_URL = settings.DATABASE_URL.strip("'\"")
 
-if DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgresql://", "postgresql+asyncpg://", 1
-    )
-elif DATABASE_URL.startswith("postgres://"):
-    DATABASE_URL = DATABASE_URL.replace(
-        "postgres://", "postgresql+asyncpg://", 1
-    )
-
-# Remove sslmode and channel_binding for asyncpg
-if "sslmode=require" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("&sslmode=require", "")
-    DATABASE_URL = DATABASE_URL.replace("sslmode=require&", "")
-    DATABASE_URL = DATABASE_URL.replace("?sslmode=require", "")
-
-if "channel_binding=require" in DATABASE_URL:
-    DATABASE_URL = DATABASE_URL.replace("&channel_binding=require", "")
-    DATABASE_URL = DATABASE_URL.replace("channel_binding=require&", "")
-    DATABASE_URL = DATABASE_URL.replace("?channel_binding=require", "")
-
-engine = create_async_engine(DATABASE_URL, echo=True)
-
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(engine) as session:
-        yield session
-
-
-# Lifespan (create tables)
+# Lifespan (check schema version; `python -m app.migrate upgrade` migrates)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+    engine = get_engine()
+    if settings.DB_MIGRATE_ON_STARTUP:
+        await upgrade(engine)
+    else:
+        await verify(engine)
+    await start_events(engine)
     yield
+    await stop_events()
+    await dispose_engines()
 
 # FastAPI app
 app = FastAPI(
@@ -55,6 +32,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Rate limiting (added before CORS so 429s still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -62,11 +42,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Retry-After"],
 )
 
+# Per-request latency, SQL and hashing time (Server-Timing + /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Routes
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(tasks.router, prefix="/api", tags=["tasks"])
+app.include_router(search.router, prefix="/api", tags=["search"])
+app.include_router(bulk.router, prefix="/api", tags=["bulk"])
+app.include_router(sync.router, prefix="/api", tags=["sync"])
+app.include_router(events.router, prefix="/api", tags=["events"])
+app.include_router(transfer.router, prefix="/api", tags=["transfer"])
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,172 @@
+import bisect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Request-level instrumentation without extra dependencies.
+#
+# A pure ASGI middleware gives every request a RequestStats in a ContextVar.
+# SQLAlchemy cursor events, the pool checkout and the password hasher add to
+# it (greenlet-run sync code shares the request's context), then the totals
+# go out as a Server-Timing header and into process-wide histograms that
+# /metrics renders in the Prometheus text format.
+#
+# Metrics are per process: scrape each worker, or sum them in Prometheus.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    hash_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            pairs = [f'{k}="{v}"' for k, v in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                yield self._sample("bucket", pairs + ['le="%s"' % bound], cumulative)
+            yield self._sample("bucket", pairs + ['le="+Inf"'], count)
+            yield self._sample("sum", pairs, total)
+            yield self._sample("count", pairs, count)
+
+    def _sample(self, kind: str, pairs: List[str], value) -> str:
+        labels = "{" + ",".join(pairs) + "}" if pairs else ""
+        return f"{self.name}_{kind}{labels} {value}"
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status")
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements per request.", ("route",), QUERY_COUNT_BUCKETS
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request.", ("route",)
+)
+pool_wait_seconds = Histogram(
+    "db_pool_checkout_seconds", "Time to check a connection out of the pool."
+)
+HISTOGRAMS = (request_seconds, request_db_queries, request_db_seconds, pool_wait_seconds)
+
+
+# ---------- HOOKS ----------
+
+def instrument_engine(engine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+def observe_pool_wait(seconds: float) -> None:
+    pool_wait_seconds.observe(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+def observe_hash(seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.hash_seconds += seconds
+
+
+# ---------- MIDDLEWARE ----------
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return (
+        f"app;dur={total * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.db_queries} queries", '
+        f"pool;dur={stats.pool_wait_seconds * 1000:.1f}, "
+        f"hash;dur={stats.hash_seconds * 1000:.1f}"
+    )
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streaming responses report time to first byte here
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # The router stores the matched route in scope; templates keep
+            # label cardinality bounded (/api/tasks/{task_id}, not ids).
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_seconds.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            request_db_queries.observe(stats.db_queries, route)
+            request_db_seconds.observe(stats.db_seconds, route)
+
+
+# ---------- EXPOSITION ----------
+
+def render(extra: Iterable[Tuple[str, str, str, float]] = ()) -> str:
+    """Prometheus text format; `extra` is (name, type, help, value) samples."""
+    lines: List[str] = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, kind, help, value in extra:
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
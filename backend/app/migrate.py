@@ -0,0 +1,212 @@
+"""Versioned schema migrations.
+
+    python -m app.migrate upgrade   # apply pending migrations
+    python -m app.migrate status    # show applied / pending
+
+Each migration runs in its own transaction and records its version in
+schema_version. Migrations are written to be idempotent (checkfirst /
+IF NOT EXISTS) so they also adopt databases that were built by the old
+create_all-at-startup code. App startup only checks the recorded version.
+"""
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.models import Task, TaskList, TaskTombstone, User
+
+logger = logging.getLogger(__name__)
+
+# Kept out of SQLModel.metadata: only this module reads or writes it.
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Arbitrary key for pg_advisory_xact_lock: concurrent upgraders queue up
+# instead of racing to apply the same migration.
+ADVISORY_LOCK_KEY = 7426_0015
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    def register(fn: Callable[[Connection], None]):
+        assert not MIGRATIONS or MIGRATIONS[-1].version == version - 1, "versions must be consecutive"
+        MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+    return register
+
+
+def create_indexes(conn: Connection, table, names) -> None:
+    indexes = {index.name: index for index in table.indexes}
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+
+# ---------- MIGRATIONS ----------
+
+@migration(1, "Create user, tasklist and task tables")
+def _base_tables(conn: Connection) -> None:
+    for table in (User.__table__, TaskList.__table__, Task.__table__):
+        table.create(conn, checkfirst=True)
+
+
+@migration(2, "Task query indexes")
+def _task_indexes(conn: Connection) -> None:
+    # (user_id, completed | list_id, created_at, id) serve the filtered,
+    # keyset-paginated listing; (user_id, due_date) the due-date ranges;
+    # (user_id, updated_at, id) delta sync and the collection ETag.
+    create_indexes(conn, Task.__table__, [
+        "ix_task_user_id",
+        "ix_task_user_created",
+        "ix_task_user_completed_created",
+        "ix_task_user_list_created",
+        "ix_task_user_due",
+        "ix_task_user_updated",
+    ])
+
+
+@migration(3, "Unique list names per user")
+def _unique_list_names(conn: Connection) -> None:
+    # Older rows could race past the name check; rename later duplicates
+    # to "<name> (<id>)" so the unique index can be built.
+    lists = TaskList.__table__
+    first_ids = select(func.min(lists.c.id)).group_by(lists.c.user_id, lists.c.name)
+    duplicates = conn.execute(
+        select(lists.c.id, lists.c.name).where(lists.c.id.not_in(first_ids))
+    ).all()
+    for list_id, name in duplicates:
+        conn.execute(
+            lists.update().where(lists.c.id == list_id).values(name=f"{name} ({list_id})"[:100])
+        )
+    create_indexes(conn, lists, ["ux_tasklist_user_name"])
+
+
+@migration(4, "Full-text task search index")
+def _search_index(conn: Connection) -> None:
+    from app.search import POSTGRES_DDL, SQLITE_DDL
+
+    statements = {"postgresql": POSTGRES_DDL, "sqlite": SQLITE_DDL}.get(conn.dialect.name, [])
+    for statement in statements:
+        conn.execute(text(statement))
+
+
+@migration(5, "Task deletion log for delta sync")
+def _tombstones(conn: Connection) -> None:
+    TaskTombstone.__table__.create(conn, checkfirst=True)
+
+
+@migration(6, "Shared rate limit buckets")
+def _rate_limit_buckets(conn: Connection) -> None:
+    from app.ratelimit import rate_limit_bucket
+
+    rate_limit_bucket.create(conn, checkfirst=True)
+
+
+@migration(7, "Shared response cache")
+def _response_cache(conn: Connection) -> None:
+    from app.cache import POSTGRES_DDL, cache_entry
+
+    if conn.dialect.name == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.execute(text(statement))
+    else:
+        cache_entry.create(conn, checkfirst=True)
+
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ---------- RUNNER ----------
+
+def current_version(conn: Connection) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def _apply(conn: Connection, step: Migration) -> bool:
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+    schema_version.create(conn, checkfirst=True)
+    if current_version(conn) >= step.version:
+        return False  # another process got here first
+    step.apply(conn)
+    conn.execute(schema_version.insert().values(
+        version=step.version, description=step.description, applied_at=datetime.utcnow()
+    ))
+    return True
+
+
+async def upgrade(engine: AsyncEngine) -> int:
+    """Apply pending migrations; returns the resulting schema version."""
+    async with engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    for step in MIGRATIONS[version:]:
+        async with engine.begin() as conn:
+            if await conn.run_sync(_apply, step):
+                logger.info("Applied migration %d: %s", step.version, step.description)
+    async with engine.connect() as conn:
+        return await conn.run_sync(current_version)
+
+
+async def verify(engine: AsyncEngine) -> None:
+    """Startup check: reads the recorded version, runs no DDL."""
+    async with engine.connect() as conn:
+        version = await conn.run_sync(current_version)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, this build needs {LATEST_VERSION}. "
+            "Run `python -m app.migrate upgrade`."
+        )
+    if version > LATEST_VERSION:
+        # Normal mid-deploy: a newer build already migrated. Migrations
+        # only add, so older code keeps working.
+        logger.warning("Database schema version %d is newer than this build (%d)", version, LATEST_VERSION)
+
+
+# ---------- CLI ----------
+
+async def _main(command: str) -> None:
+    from app.database import get_engine
+
+    engine = get_engine()
+    try:
+        if command == "upgrade":
+            print(f"schema version {await upgrade(engine)}")
+        else:
+            async with engine.connect() as conn:
+                version = await conn.run_sync(current_version)
+            for step in MIGRATIONS:
+                state = "applied" if step.version <= version else "pending"
+                print(f"{step.version:>4}  {state:<8} {step.description}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+    if command not in ("upgrade", "status"):
+        sys.exit("usage: python -m app.migrate [upgrade|status]")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(command))
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime, date
 import enum
@@ -23,6 +24,10 @@ class User(SQLModel, table=True):
 
 
 class TaskList(SQLModel, table=True):
+    __table_args__ = (
+        Index("ux_tasklist_user_name", "user_id", "name", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(min_length=1, max_length=100)
     user_id: int = Field(foreign_key="user.id", index=True)
@@ -34,6 +39,16 @@ class TaskList(SQLModel, table=True):
 
 
 class Task(SQLModel, table=True):
+    # Composite indexes back the keyset-paginated listing: every filter
+    # combination is a prefix seek ordered by (created_at, id).
+    __table_args__ = (
+        Index("ix_task_user_created", "user_id", "created_at", "id"),
+        Index("ix_task_user_completed_created", "user_id", "completed", "created_at", "id"),
+        Index("ix_task_user_list_created", "user_id", "list_id", "created_at", "id"),
+        Index("ix_task_user_due", "user_id", "due_date"),
+        Index("ix_task_user_updated", "user_id", "updated_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(min_length=1, max_length=255)
     description: Optional[str] = Field(default=None, max_length=1000)
@@ -46,4 +61,17 @@ class Task(SQLModel, table=True):
     owner: User = Relationship(back_populates="tasks")
     task_list: Optional[TaskList] = Relationship(back_populates="tasks")
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TaskTombstone(SQLModel, table=True):
+    # Deletion log for delta sync: hard deletes leave one row here so
+    # clients holding a sync token learn which tasks disappeared.
+    __table_args__ = (
+        Index("ix_tasktombstone_user_deleted", "user_id", "deleted_at", "task_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    task_id: int
+    user_id: int = Field(foreign_key="user.id")
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
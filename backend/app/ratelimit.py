@@ -0,0 +1,230 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Boolean, Column, Float, MetaData, String, Table, text
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.database import choose_backend
+
+logger = logging.getLogger(__name__)
+
+# Token-bucket rate limiting in front of the routers.
+#
+# Each request spends one token from every bucket that applies to it: the
+# caller's bucket (user id when the bearer token verifies, else client IP)
+# and, for login/register, a much smaller per-IP bucket that caps bcrypt
+# work. Buckets refill continuously at `per_minute / 60` tokens a second up
+# to `burst`. A request that finds a bucket empty gets 429 with Retry-After
+# set to when the next token arrives.
+#
+# The backend holds bucket state: "memory" is per worker; "postgres" is one
+# atomic UPSERT per bucket, shared by every worker. Backend errors fail open.
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    burst: int
+    per_minute: int
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60.0
+
+
+USER = Rule("user", settings.RATE_LIMIT_USER_BURST, settings.RATE_LIMIT_USER_PER_MINUTE)
+IP = Rule("ip", settings.RATE_LIMIT_IP_BURST, settings.RATE_LIMIT_IP_PER_MINUTE)
+AUTH = Rule("auth", settings.RATE_LIMIT_AUTH_BURST, settings.RATE_LIMIT_AUTH_PER_MINUTE)
+
+# Password routes: every call may cost a bcrypt hash
+AUTH_PATHS = {"/api/auth/login", "/api/auth/register"}
+EXEMPT_PATHS = {"/", "/metrics"}
+
+# Kept out of SQLModel.metadata; created by migration 6.
+rate_limit_bucket = Table(
+    "rate_limit_bucket",
+    MetaData(),
+    Column("key", String(200), primary_key=True),
+    Column("tokens", Float, nullable=False),
+    Column("updated_at", Float, nullable=False),  # unix seconds
+    Column("allowed", Boolean, nullable=False),   # outcome of the last take
+)
+
+
+def refill(tokens: float, elapsed: float, rule: Rule) -> float:
+    return min(float(rule.burst), tokens + max(elapsed, 0.0) * rule.rate)
+
+
+def retry_after(tokens: float, rule: Rule) -> float:
+    return (1.0 - tokens) / rule.rate if rule.rate > 0 else 60.0
+
+
+class BucketBackend:
+    async def take(self, key: str, rule: Rule, now: float) -> float:
+        """Spend one token; 0 if allowed, else seconds until one is available."""
+        raise NotImplementedError
+
+
+class MemoryBackend(BucketBackend):
+    """Per-worker buckets in a bounded LRU (an evicted bucket restarts full).
+
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rule: Rule, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (float(rule.burst), now))
+        tokens = refill(tokens, now - updated, rule)
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = retry_after(tokens, rule)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class PostgresBackend(BucketBackend):
+    """Shared buckets: refill and spend in one INSERT ... ON CONFLICT.
+
+    Costs one round trip per bucket on a pooled connection. Rows for idle
+    keys are harmless (they read as full) and can be pruned at will.
+    """
+
+    # Refilled level of the existing row. Parameters are cast because
+    # asyncpg would otherwise infer integer types for them.
+    LEVEL = (
+        "LEAST(CAST(:burst AS double precision), b.tokens"
+        " + GREATEST(CAST(:now AS double precision) - b.updated_at, 0) * CAST(:rate AS double precision))"
+    )
+    TAKE = text(f"""
+        INSERT INTO rate_limit_bucket AS b (key, tokens, updated_at, allowed)
+        VALUES (:key, CAST(:burst AS double precision) - 1, CAST(:now AS double precision), true)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE WHEN {LEVEL} >= 1 THEN {LEVEL} - 1 ELSE {LEVEL} END,
+            allowed = {LEVEL} >= 1,
+            updated_at = excluded.updated_at
+        RETURNING tokens, allowed
+    """)
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def take(self, key: str, rule: Rule, now: float) -> float:
+        params = {"key": key, "burst": float(rule.burst), "rate": rule.rate, "now": now}
+        async with self.engine.connect() as conn:
+            tokens, allowed = (await conn.execute(self.TAKE, params)).one()
+            await conn.commit()
+        return 0.0 if allowed else retry_after(tokens, rule)
+
+
+def create_backend() -> BucketBackend:
+    return choose_backend(
+        settings.RATE_LIMIT_BACKEND, PostgresBackend,
+        lambda: MemoryBackend(settings.RATE_LIMIT_MEMORY_KEYS),
+    )
+
+
+class RateLimiter:
+    def __init__(self):
+        self._backend: Optional[BucketBackend] = None  # see choose_backend
+        self.rejected = 0
+
+    @property
+    def backend(self) -> BucketBackend:
+        if self._backend is None:
+            self._backend = create_backend()
+        return self._backend
+
+    async def check(self, buckets: List[Tuple[str, Rule]]) -> float:
+        """Spend from each bucket in turn; the first empty one stops the request."""
+        now = time.time()
+        for key, rule in buckets:
+            try:
+                wait = await self.backend.take(f"{rule.name}:{key}", rule, now)
+            except Exception:
+                logger.exception("Rate limit backend failed; allowing request")
+                return 0.0
+            if wait > 0:
+                self.rejected += 1
+                return wait
+        return 0.0
+
+
+limiter = RateLimiter()
+
+
+# ---------- MIDDLEWARE ----------
+
+def client_ip(scope) -> str:
+    if settings.RATE_LIMIT_TRUST_PROXY:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                # Left-most entry is the original client
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def bearer_user_id(scope) -> Optional[int]:
+    # Imported here: the migration CLI imports this module for its table
+    # and must run without the JWT secret
+    from app.auth import authenticate
+
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                # Same verification (and cache) the route will use
+                return authenticate(token).user_id
+            except HTTPException:
+                return None  # the route answers 401; count it against the IP
+    return None
+
+
+def buckets_for(scope) -> List[Tuple[str, Rule]]:
+    ip = client_ip(scope)
+    buckets: List[Tuple[str, Rule]] = []
+    if scope["path"] in AUTH_PATHS:
+        buckets.append((ip, AUTH))
+    user_id = bearer_user_id(scope)
+    buckets.append((str(user_id), USER) if user_id is not None else (ip, IP))
+    return buckets
+
+
+class RateLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in EXEMPT_PATHS
+        ):
+            return await self.app(scope, receive, send)
+
+        wait = await limiter.check(buckets_for(scope))
+        if wait > 0:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            return await response(scope, receive, send)
+        await self.app(scope, receive, send)
@@ -0,0 +1,156 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import insert, update
+from datetime import datetime
+
+from ..models import Task
+from ..schemas import (
+    TaskBulkCreate, TaskBulkUpdate, TaskBulkIds, TaskBulkComplete,
+    BulkItemResult, BulkResult, TaskResponse,
+)
+from ..database import get_session
+from .. import crud, events
+from ..auth import verify_token
+
+router = APIRouter()
+
+# Patch fields that may be omitted but not set to null
+NOT_NULL_COLUMNS = {column.name for column in Task.__table__.c if not column.nullable}
+
+# Every batch runs in one transaction with a fixed number of statements,
+# independent of its size: at most one task-ownership and one list-ownership
+# query, one multi-row write, and at most one read-back. Items that fail
+# validation are reported per index and skipped; the rest are committed
+# together. Push subscribers get one "tasks.changed" event per batch and
+# catch up through /api/tasks/changes.
+
+
+@router.post("/tasks/bulk", response_model=BulkResult)
+async def bulk_create_tasks(
+    batch: TaskBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    lists = await crud.owned_list_ids(session, user_id, (task.list_id for task in batch.tasks))
+
+    results = [BulkItemResult(index=i, ok=False) for i in range(len(batch.tasks))]
+    valid = []
+    for i, task in enumerate(batch.tasks):
+        if task.list_id and task.list_id not in lists:
+            results[i].error = "Invalid list ID"
+        else:
+            valid.append(i)
+
+    if valid:
+        # Core insert so every row has the same key set and goes out as one
+        # multi-row INSERT ... RETURNING (ORM bulk insert splits on NULLs).
+        # list_id 0 means "no list", as in crud.create_task_for_user
+        rows = [
+            {**batch.tasks[i].model_dump(), "list_id": batch.tasks[i].list_id or None, "user_id": user_id}
+            for i in valid
+        ]
+        table = Task.__table__
+        statement = insert(table).returning(*table.c, sort_by_parameter_order=True)
+        created = (await session.execute(statement, rows)).all()
+        for i, db_task in zip(valid, created):
+            results[i] = BulkItemResult(
+                index=i, id=db_task.id, ok=True, task=TaskResponse.model_validate(db_task)
+            )
+
+    await session.commit()
+    await events.publish(user_id, "tasks.changed", {"count": sum(item.ok for item in results)})
+    return BulkResult(results=results)
+
+
+@router.patch("/tasks/bulk", response_model=BulkResult)
+async def bulk_update_tasks(
+    batch: TaskBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    ids = {patch.id for patch in batch.tasks}
+    owned_statement = select(Task.id).where(Task.user_id == user_id, Task.id.in_(ids))
+    owned = set((await session.execute(owned_statement)).scalars().all())
+    lists = await crud.owned_list_ids(session, user_id, (patch.list_id for patch in batch.tasks))
+
+    now = datetime.utcnow()
+    results = [BulkItemResult(index=i, id=patch.id, ok=False) for i, patch in enumerate(batch.tasks)]
+    rows = []
+    for i, patch in enumerate(batch.tasks):
+        if patch.id not in owned:
+            results[i].error = "Task not found"
+            continue
+        if patch.list_id and patch.list_id not in lists:
+            results[i].error = "Invalid list ID"
+            continue
+        values = patch.model_dump(exclude_unset=True)
+        nulls = sorted(name for name, value in values.items() if value is None and name in NOT_NULL_COLUMNS)
+        if nulls:
+            results[i].error = f"{', '.join(nulls)} cannot be null"
+            continue
+        if "list_id" in values and not values["list_id"]:
+            values["list_id"] = None  # 0 or None means no list
+        rows.append({**values, "updated_at": now})
+        results[i].ok = True
+
+    if rows:
+        # ORM bulk UPDATE by primary key: one executemany per distinct set
+        # of patched columns. Ownership was checked above in this transaction.
+        await session.execute(update(Task), rows)
+        updated_ids = {row["id"] for row in rows}
+        read_back = select(Task).where(Task.id.in_(updated_ids)).execution_options(populate_existing=True)
+        updated = {task.id: task for task in (await session.execute(read_back)).scalars().all()}
+        for item in results:
+            if item.ok:
+                item.task = TaskResponse.model_validate(updated[item.id])
+
+    await session.commit()
+    await events.publish(user_id, "tasks.changed", {"count": sum(item.ok for item in results)})
+    return BulkResult(results=results)
+
+
+@router.post("/tasks/bulk/complete", response_model=BulkResult)
+async def bulk_complete_tasks(
+    batch: TaskBulkComplete,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    statement = (
+        update(Task)
+        .where(Task.user_id == user_id, Task.id.in_(set(batch.ids)))
+        .values(completed=batch.completed, updated_at=datetime.utcnow())
+        .returning(Task)
+        .execution_options(synchronize_session=False)
+    )
+    updated = {task.id: task for task in (await session.execute(statement)).scalars().all()}
+
+    results = [
+        BulkItemResult(index=i, id=task_id, ok=True, task=TaskResponse.model_validate(updated[task_id]))
+        if task_id in updated
+        else BulkItemResult(index=i, id=task_id, ok=False, error="Task not found")
+        for i, task_id in enumerate(batch.ids)
+    ]
+
+    await session.commit()
+    await events.publish(user_id, "tasks.changed", {"count": sum(item.ok for item in results)})
+    return BulkResult(results=results)
+
+
+@router.post("/tasks/bulk/delete", response_model=BulkResult)
+async def bulk_delete_tasks(
+    batch: TaskBulkIds,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    deleted = await crud.delete_tasks(session, user_id, batch.ids)
+
+    results = [
+        BulkItemResult(index=i, id=task_id, ok=task_id in deleted,
+                       error=None if task_id in deleted else "Task not found")
+        for i, task_id in enumerate(batch.ids)
+    ]
+
+    await session.commit()
+    await events.publish(user_id, "tasks.changed", {"count": sum(item.ok for item in results)})
+    return BulkResult(results=results)
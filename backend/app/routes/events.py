@@ -0,0 +1,53 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from ..auth import Principal, authenticate_active, security
+from ..config import settings
+from ..events import broker, encode_sse
+
+router = APIRouter()
+
+# ---------- PUSH EVENTS ----------
+
+async def get_stream_principal(
+    token: Optional[str] = None,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> Principal:
+    # EventSource cannot set headers, so browsers pass ?token= instead
+    if credentials is not None:
+        return await authenticate_active(credentials.credentials)
+    if token:
+        return await authenticate_active(token)
+    raise HTTPException(status_code=401, detail="Authorization header missing")
+
+
+@router.get("/events")
+async def task_events(
+    request: Request,
+    principal: Principal = Depends(get_stream_principal)
+):
+    # No DB session is held: the stream only waits on this user's queue.
+    user_id = principal.user_id
+    queue = broker.subscribe(user_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    event = None
+                yield encode_sse(event)
+        finally:
+            broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
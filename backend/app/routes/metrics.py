@@ -0,0 +1,68 @@
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from ..auth import security
+from ..cache import MemoryBackend, response_cache
+from ..config import settings
+from ..database import get_engine
+from ..events import broker
+from ..hashing import password_hasher
+from ..metrics import render
+from ..ratelimit import limiter
+
+router = APIRouter()
+
+# ---------- METRICS ----------
+
+def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> None:
+    # Per-route traffic and pool/cache internals are not for the public API
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def metrics():
+    hasher = password_hasher.stats()
+    extra = [
+        ("password_hash_queued", "gauge", "Hash calls waiting for a worker.", hasher["queued"]),
+        ("password_hash_running", "gauge", "Hash calls on a worker.", hasher["running"]),
+        ("password_hash_completed_total", "counter", "Hash calls finished.", hasher["completed"]),
+        ("password_hash_rejected_total", "counter", "Hash calls refused with 503.", hasher["rejected"]),
+        ("password_hash_seconds_total", "counter", "Time spent inside bcrypt.", hasher["hash_seconds"]),
+        ("password_hash_wait_seconds_total", "counter", "Time queued for a worker.", hasher["wait_seconds"]),
+        ("rate_limit_rejected_total", "counter", "Requests refused with 429.", limiter.rejected),
+        ("events_listener_reconnects_total", "counter", "Event listener connections replaced after a loss.",
+         broker.reconnects),
+        ("response_cache_hits_total", "counter", "Reads served from the response cache.", response_cache.hits),
+        ("response_cache_misses_total", "counter", "Cacheable reads that queried the database.", response_cache.misses),
+        ("response_cache_invalidations_total", "counter", "Per-user namespaces invalidated by writes.",
+         response_cache.invalidations),
+    ]
+    cache_backend = response_cache.backend
+    if isinstance(cache_backend, MemoryBackend):
+        extra += [
+            ("response_cache_entries", "gauge", "Entries held by this worker.", len(cache_backend)),
+            ("response_cache_bytes", "gauge", "Bytes held by this worker.", cache_backend.size),
+            ("response_cache_evictions_total", "counter", "Entries evicted to stay within bounds.",
+             cache_backend.evictions),
+        ]
+    pool = get_engine().pool
+    if hasattr(pool, "checkedout"):
+        extra += [
+            ("db_pool_checked_out", "gauge", "Connections in use.", pool.checkedout()),
+            ("db_pool_size", "gauge", "Configured pool size.", pool.size()),
+            ("db_pool_overflow", "gauge", "Connections beyond pool_size.", max(pool.overflow(), 0)),
+        ]
+    return PlainTextResponse(render(extra), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List
+
+from ..schemas import TaskResponse, TaskSearchHit
+from ..search import search_terms, search_statement
+from ..auth import get_read_session, verify_token
+
+router = APIRouter()
+
+# ---------- SEARCH ----------
+
+@router.get("/tasks/search", response_model=List[TaskSearchHit])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_read_session),
+    user_id: int = Depends(verify_token)
+):
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    statement = search_statement(session.bind.dialect.name, user_id, terms, limit, offset)
+    result = await session.execute(statement)
+    return [
+        TaskSearchHit(**TaskResponse.model_validate(task).model_dump(), rank=rank)
+        for task, rank in result.all()
+    ]
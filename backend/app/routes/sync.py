@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
+
+from ..schemas import TaskChanges
+from ..database import get_session
+from ..pagination import encode_cursor, decode_cursor
+from ..sync import read_changes, token_expired
+from ..auth import verify_token
+
+router = APIRouter()
+
+DEFAULT_CHANGES_PAGE_SIZE = 500
+MAX_CHANGES_PAGE_SIZE = 1000
+
+# ---------- DELTA SYNC ----------
+
+@router.get("/tasks/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_CHANGES_PAGE_SIZE, ge=1, le=MAX_CHANGES_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    # No token: full snapshot (paged). Keep calling with next_token while
+    # has_more is true, then poll with the last token.
+    since_key = decode_cursor(since) if since else None
+    if since_key is not None and token_expired(since_key):
+        # Deletions this old may be pruned: the client must start over
+        raise HTTPException(status_code=410, detail="Sync token expired; resync without since")
+    changed, deleted, next_key, has_more = await read_changes(session, user_id, since_key, limit)
+    return TaskChanges(
+        changed=changed,
+        deleted=deleted,
+        next_token=encode_cursor(*next_key),
+        has_more=has_more,
+    )
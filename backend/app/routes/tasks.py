@@ -1,49 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlmodel import select
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
-from jose import JWTError, jwt
-import os
-from dotenv import load_dotenv
-from datetime import datetime
+from typing import List, Literal, Optional
+from datetime import datetime, date
+from pydantic import TypeAdapter
 
-load_dotenv()
-
-from ..models import Task, TaskList
-from ..schemas import TaskCreate, TaskUpdate, TaskResponse, TaskListCreate, TaskListResponse
+from ..schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskListCreate, TaskListResponse, TaskStats, ListTaskCount,
+)
 from ..database import get_session
+from ..auth import get_read_session, verify_token
+from ..pagination import encode_cursor, decode_cursor
+from .. import crud, events
+from ..cache import LISTS, TASKS, response_cache
+from ..serialization import RawJSONResponse, rows_to_json
+from ..etag import collection_etag, etag_matches, not_modified, validator_headers
 
 router = APIRouter()
 
-SECRET_KEY = os.getenv("BETTER_AUTH_SECRET")
-
-def verify_token(authorization: str = Header(None)):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authorization header missing")
-    
-    try:
-        token_type, token = authorization.split()
-        if token_type.lower() != "bearer":
-            raise HTTPException(status_code=401, detail="Invalid token type")
-        
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return int(user_id)
-    except (ValueError, JWTError):
-        raise HTTPException(status_code=401, detail="Invalid token")
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Queries live in app.crud (shared with the v1 API); handlers here own the
+# HTTP side: validators, status codes, commit, then push events. Read-only
+# handlers take get_read_session, which may be a replica. The list, task and
+# stats reads go through app.cache first; publishing an event is what
+# invalidates the user's cached "tasks" and/or "lists" responses, so every
+# mutation here must publish after it commits.
+
+TASK_LISTS = TypeAdapter(List[TaskListResponse])
+
+
+def event_payload(schema, row) -> dict:
+    return schema.model_validate(dict(row._mapping)).model_dump(mode="json")
 
 # ---------- TASK LISTS ----------
 
 @router.get("/lists", response_model=List[TaskListResponse])
 async def get_lists(
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
     user_id: int = Depends(verify_token)
 ):
-    statement = select(TaskList).where(TaskList.user_id == user_id)
-    result = await session.execute(statement)
-    return result.scalars().all()
+    cached = await response_cache.lookup(request, user_id, LISTS)
+    if cached.hit:
+        return cached.respond(request)
+
+    count, max_id, last_modified = await crud.list_collection_version(session, user_id)
+    etag = collection_etag(request, count, max_id)
+    headers = validator_headers(etag, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+
+    lists = await crud.get_lists(session, user_id)
+    body = TASK_LISTS.dump_json(TASK_LISTS.validate_python(lists, from_attributes=True))
+    return await response_cache.store(cached, RawJSONResponse(body, headers=headers))
 
 @router.post("/lists", response_model=TaskListResponse)
 async def create_list(
@@ -51,62 +61,91 @@ async def create_list(
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(verify_token)
 ):
-    # Check if list name already exists for this user
-    statement = select(TaskList).where(
-        TaskList.user_id == user_id,
-        TaskList.name == task_list.name
-    )
-    result = await session.execute(statement)
-    existing_list = result.scalar_one_or_none()
-    
-    if existing_list:
+    row = await crud.create_list(session, user_id, task_list.name)
+    if row is None:
         raise HTTPException(status_code=400, detail="List name already exists")
-    
-    db_list = TaskList(
-        name=task_list.name,
-        user_id=user_id
-    )
-    
-    session.add(db_list)
+
     await session.commit()
-    await session.refresh(db_list)
-    return db_list
+    await events.publish(user_id, "list.created", event_payload(TaskListResponse, row))
+    return row._mapping
 
 @router.delete("/lists/{list_id}")
 async def delete_list(
     list_id: int,
+    delete_tasks: bool = False,
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(verify_token)
 ):
-    statement = select(TaskList).where(TaskList.id == list_id, TaskList.user_id == user_id)
-    result = await session.execute(statement)
-    db_list = result.scalar_one_or_none()
-    
-    if not db_list:
+    if not await crud.delete_list(session, user_id, list_id, delete_tasks):
         raise HTTPException(status_code=404, detail="List not found")
-    
-    # Update tasks in this list to have no list
-    tasks_statement = select(Task).where(Task.list_id == list_id, Task.user_id == user_id)
-    tasks_result = await session.execute(tasks_statement)
-    tasks = tasks_result.scalars().all()
-    
-    for task in tasks:
-        task.list_id = None
-    
-    await session.delete(db_list)
+
     await session.commit()
+    await events.publish(user_id, "list.deleted", {"id": list_id, "delete_tasks": delete_tasks})
     return {"message": "List deleted successfully"}
 
 # ---------- TASKS ----------
 
 @router.get("/tasks", response_model=List[TaskResponse])
 async def get_tasks(
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    completed: Optional[bool] = None,
+    list_id: Optional[int] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    order: Literal["asc", "desc"] = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_read_session),
+    user_id: int = Depends(verify_token)
+):
+    cached = await response_cache.lookup(request, user_id, TASKS)
+    if cached.hit:
+        return cached.respond(request)
+
+    count, last_modified, max_id = await crud.task_collection_version(session, user_id)
+    etag = collection_etag(request, count, last_modified and last_modified.isoformat(), max_id)
+    headers = validator_headers(etag, last_modified)
+    if etag_matches(request, etag):
+        return not_modified(headers)
+
+    # Without a limit the full (filtered) collection is returned, as before.
+    if limit is None and cursor:
+        limit = DEFAULT_PAGE_SIZE
+    rows, has_more = await crud.get_task_page(
+        session, user_id,
+        completed=completed, list_id=list_id, due_from=due_from, due_to=due_to,
+        order=order, after=decode_cursor(cursor) if cursor else None, limit=limit,
+    )
+    if has_more:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    # Plain column rows encoded straight to bytes (see app.serialization);
+    # returned directly, so response_model only documents the shape
+    return await response_cache.store(cached, RawJSONResponse(rows_to_json(rows), headers=headers))
+
+@router.get("/tasks/stats", response_model=TaskStats)
+async def get_task_stats(
+    request: Request,
+    today: Optional[date] = None,
+    session: AsyncSession = Depends(get_read_session),
     user_id: int = Depends(verify_token)
 ):
-    statement = select(Task).where(Task.user_id == user_id)
-    result = await session.execute(statement)
-    return result.scalars().all()
+    cached = await response_cache.lookup(request, user_id, TASKS)
+    if cached.hit:
+        return cached.respond(request)
+
+    # Sidebar counts in one grouped aggregate. `today` lets clients pass
+    # their local date; it defaults to the server's UTC date.
+    rows = await crud.get_task_stats(session, user_id, today or datetime.utcnow().date())
+
+    stats = TaskStats(
+        total=sum(row[1] for row in rows),
+        completed=sum(row[2] for row in rows),
+        today=sum(row[3] for row in rows),
+        upcoming=sum(row[4] for row in rows),
+        scheduled=sum(row[5] for row in rows),
+        lists=[ListTaskCount(list_id=row[0], total=row[1], completed=row[2]) for row in rows],
+    )
+    return await response_cache.store(cached, RawJSONResponse(stats.model_dump_json().encode()))
 
 @router.post("/tasks", response_model=TaskResponse)
 async def create_task(
@@ -114,29 +153,13 @@ async def create_task(
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(verify_token)
 ):
-    # Validate list_id if provided
-    if task.list_id:
-        list_statement = select(TaskList).where(
-            TaskList.id == task.list_id,
-            TaskList.user_id == user_id
-        )
-        list_result = await session.execute(list_statement)
-        if not list_result.scalar_one_or_none():
-            raise HTTPException(status_code=400, detail="Invalid list ID")
-    
-    db_task = Task(
-        title=task.title,
-        description=task.description,
-        completed=task.completed,
-        due_date=task.due_date,
-        list_id=task.list_id,
-        user_id=user_id
-    )
-    
-    session.add(db_task)
+    row = await crud.create_task_for_user(session, task, user_id)
+    if row is None:
+        raise HTTPException(status_code=400, detail="Invalid list ID")
+
     await session.commit()
-    await session.refresh(db_task)
-    return db_task
+    await events.publish(user_id, "task.created", event_payload(TaskResponse, row))
+    return row._mapping
 
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
@@ -145,33 +168,16 @@ async def update_task(
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(verify_token)
 ):
-    statement = select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    result = await session.execute(statement)
-    db_task = result.scalar_one_or_none()
-    
-    if not db_task:
+    row = await crud.update_task(session, task_id, task_update, user_id)
+    if row is None:
+        # Failure path only: tell a missing task apart from a foreign list
+        if task_update.list_id and await crud.task_exists(session, task_id, user_id):
+            raise HTTPException(status_code=400, detail="Invalid list ID")
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Validate list_id if being updated
-    if task_update.list_id is not None:
-        if task_update.list_id > 0:  # 0 or None means no list
-            list_statement = select(TaskList).where(
-                TaskList.id == task_update.list_id,
-                TaskList.user_id == user_id
-            )
-            list_result = await session.execute(list_statement)
-            if not list_result.scalar_one_or_none():
-                raise HTTPException(status_code=400, detail="Invalid list ID")
-    
-    update_data = task_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_task, field, value)
-    
-    db_task.updated_at = datetime.utcnow()
-    
+
     await session.commit()
-    await session.refresh(db_task)
-    return db_task
+    await events.publish(user_id, "task.updated", event_payload(TaskResponse, row))
+    return row._mapping
 
 @router.delete("/tasks/{task_id}")
 async def delete_task(
@@ -179,13 +185,9 @@ async def delete_task(
     session: AsyncSession = Depends(get_session),
     user_id: int = Depends(verify_token)
 ):
-    statement = select(Task).where(Task.id == task_id, Task.user_id == user_id)
-    result = await session.execute(statement)
-    db_task = result.scalar_one_or_none()
-    
-    if not db_task:
+    if not await crud.delete_task(session, task_id, user_id):
         raise HTTPException(status_code=404, detail="Task not found")
-    
-    await session.delete(db_task)
+
     await session.commit()
-    return {"message": "Task deleted successfully"}
\ No newline at end of file
+    await events.publish(user_id, "task.deleted", {"id": task_id})
+    return {"message": "Task deleted successfully"}
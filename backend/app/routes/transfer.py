@@ -0,0 +1,199 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models import Task, TaskList
+from ..schemas import ListImport, TaskImport, ImportLineError, ImportResult
+from ..database import get_session, read_engine
+from ..auth import verify_token
+from .. import events
+
+router = APIRouter()
+
+EXPORT_CHUNK_ROWS = 500        # rows per server-side cursor fetch / response chunk
+IMPORT_BATCH_SIZE = 500        # tasks per INSERT + commit
+MAX_IMPORT_LINE_BYTES = 1 << 20
+MAX_IMPORT_ERRORS = 100
+
+LIST_FIELDS = ["id", "name", "created_at"]
+TASK_FIELDS = ["id", "title", "description", "completed", "due_date", "list_id", "created_at", "updated_at"]
+
+# Export format (NDJSON): one {"type": "list", ...} line per list, then one
+# {"type": "task", ...} line per task. Import accepts the same lines; ids are
+# only used to map tasks onto the lists created by the import.
+
+# ---------- EXPORT ----------
+
+async def stream_rows(user_id: int, table, fields: List[str]):
+    # Own session: the stream outlives the endpoint call. yield_per keeps a
+    # server-side cursor (asyncpg) open, so memory stays flat. Long scans
+    # like this are what the read replica is for.
+    columns = [table.c[name] for name in fields]
+    statement = (
+        select(*columns)
+        .where(table.c.user_id == user_id)
+        .order_by(table.c.id)
+        .execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    )
+    async with AsyncSession(read_engine(user_id)) as session:
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+
+
+async def export_ndjson(user_id: int):
+    for kind, table, fields in (("list", TaskList.__table__, LIST_FIELDS), ("task", Task.__table__, TASK_FIELDS)):
+        async for rows in stream_rows(user_id, table, fields):
+            yield b"".join(to_json({"type": kind, **dict(zip(fields, row))}) + b"\n" for row in rows)
+
+
+async def export_csv(user_id: int):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TASK_FIELDS)
+    async for rows in stream_rows(user_id, Task.__table__, TASK_FIELDS):
+        writer.writerows(
+            ["" if value is None else value.isoformat() if hasattr(value, "isoformat") else value for value in row]
+            for row in rows
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("/export")
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user_id: int = Depends(verify_token)
+):
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    if format == "csv":
+        body, media_type = export_csv(user_id), "text/csv"
+    else:
+        body, media_type = export_ndjson(user_id), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks-{stamp}.{format}"'},
+    )
+
+# ---------- IMPORT ----------
+
+async def request_lines(request: Request):
+    """Yield (line number, bytes) as the body arrives; never buffers it whole."""
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            yield number, line
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            raise HTTPException(status_code=413, detail=f"Line {number + 1} is longer than {MAX_IMPORT_LINE_BYTES} bytes")
+    if buffer:
+        yield number + 1, buffer
+
+
+async def import_list(session: AsyncSession, user_id: int, item: ListImport) -> int:
+    # Lists are few; reuse a list of the same name instead of failing
+    existing = await session.execute(
+        select(TaskList.id).where(TaskList.user_id == user_id, TaskList.name == item.name)
+    )
+    list_id = existing.scalar_one_or_none()
+    if list_id is None:
+        list_table = TaskList.__table__
+        result = await session.execute(
+            insert(list_table)
+            .values(name=item.name, user_id=user_id, created_at=datetime.utcnow())
+            .returning(list_table.c.id)
+        )
+        list_id = result.scalar_one()
+    return list_id
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_tasks(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    user_id: int = Depends(verify_token)
+):
+    # Each batch is its own transaction, so a failure part-way keeps what
+    # was already committed. Progress goes out as "import.progress" push
+    # events (the response cannot stream while the body is being read).
+    list_ids: Dict[int, int] = {}
+    batch: List[dict] = []
+    result = ImportResult(lists=0, tasks=0, batches=0, errors=[])
+
+    def error(line: int, message: str) -> None:
+        if len(result.errors) < MAX_IMPORT_ERRORS:
+            result.errors.append(ImportLineError(line=line, error=message))
+
+    async def flush() -> None:
+        if not batch:
+            return
+        await session.execute(insert(Task.__table__), batch)
+        await session.commit()
+        result.tasks += len(batch)
+        result.batches += 1
+        batch.clear()
+        await events.publish(user_id, "import.progress", result.model_dump(exclude={"errors"}))
+
+    async for number, line in request_lines(request):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+            kind = record.pop("type", "task")
+            if kind == "list":
+                item = ListImport.model_validate(record)
+                list_id = await import_list(session, user_id, item)
+                if item.id is not None:
+                    list_ids[item.id] = list_id
+                result.lists += 1
+                continue
+            if kind != "task":
+                raise ValueError(f"unknown type {kind!r}")
+            task = TaskImport.model_validate(record)
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            error(number, f"{'.'.join(map(str, first['loc']))}: {first['msg']}")
+            continue
+        except ValueError as exc:  # includes JSONDecodeError
+            error(number, str(exc))
+            continue
+
+        now = datetime.utcnow()
+        values = task.model_dump()
+        values["list_id"] = values["list_id"] or None  # 0 or None means no list
+        if values["list_id"] is not None:
+            values["list_id"] = list_ids.get(values["list_id"])
+            if values["list_id"] is None:
+                error(number, "list_id not defined by an earlier list line; imported without a list")
+        values.update(user_id=user_id, created_at=values["created_at"] or now, updated_at=now)
+        batch.append(values)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+
+    await flush()
+    await session.commit()  # lists created after the last task batch
+    if result.lists:
+        # Final progress also announces those lists ("tasks.changed" covers
+        # tasks only, e.g. for the response cache)
+        await events.publish(user_id, "import.progress", result.model_dump(exclude={"errors"}))
+    if result.tasks or result.lists:
+        await events.publish(user_id, "tasks.changed", {"count": result.tasks})
+    return result
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime, date
 
 # ---------- AUTH ----------
@@ -80,4 +80,94 @@ class TaskResponse(TaskBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ListTaskCount(BaseModel):
+    list_id: Optional[int]
+    total: int
+    completed: int
+
+
+class TaskStats(BaseModel):
+    total: int
+    completed: int
+    today: int
+    upcoming: int
+    scheduled: int
+    lists: List[ListTaskCount]
+
+# ---------- BULK TASKS ----------
+
+BULK_MAX_ITEMS = 1000
+
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TaskPatch(TaskUpdate):
+    id: int
+
+
+class TaskBulkUpdate(BaseModel):
+    tasks: List[TaskPatch] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TaskBulkIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class TaskBulkComplete(TaskBulkIds):
+    completed: bool = True
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    task: Optional[TaskResponse] = None
+
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+
+# ---------- SEARCH ----------
+
+class TaskSearchHit(TaskResponse):
+    rank: float
+
+
+# ---------- SYNC ----------
+
+class TaskChanges(BaseModel):
+    changed: List[TaskResponse]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
+# ---------- EXPORT / IMPORT ----------
+
+class ListImport(BaseModel):
+    id: Optional[int] = None  # id in the exporting account, used to remap tasks
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class TaskImport(TaskCreate):
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = Field(None, max_length=1000)
+    created_at: Optional[datetime] = None
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResult(BaseModel):
+    lists: int
+    tasks: int
+    batches: int
+    errors: List[ImportLineError]
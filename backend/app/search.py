@@ -0,0 +1,75 @@
+import re
+from typing import List
+
+from sqlalchemy import column, func, literal_column, table, text
+from sqlmodel import select
+
+from app.models import Task
+
+# Full-text index over task title + description.
+#
+# Postgres: an expression GIN index over a tsvector. Queries must use the
+# exact same expression (TASK_DOCUMENT) for the planner to pick the index.
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+#
+# Migration 4 is the only place this DDL runs.
+
+TASK_DOCUMENT = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_task_search ON task USING GIN ({TASK_DOCUMENT})",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, content='task', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO task_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+]
+
+task_fts = table("task_fts", column("rowid"))
+
+
+def search_terms(query: str) -> List[str]:
+    # Only word characters reach the tsquery / MATCH syntax.
+    return re.findall(r"\w+", query.lower())
+
+
+def search_statement(dialect: str, user_id: int, terms: List[str], limit: int, offset: int):
+    """Ranked, prefix-matching search over a user's tasks (higher rank = better)."""
+    if dialect == "postgresql":
+        document = literal_column(TASK_DOCUMENT)
+        tsquery = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms)
+        )
+        rank = func.ts_rank(document, tsquery)
+        statement = select(Task, rank.label("rank")).where(
+            Task.user_id == user_id,
+            document.op("@@")(tsquery),
+        )
+    else:
+        rank = -literal_column("bm25(task_fts)")
+        statement = (
+            select(Task, rank.label("rank"))
+            .join(task_fts, task_fts.c.rowid == Task.id)
+            .where(
+                Task.user_id == user_id,
+                text("task_fts MATCH :match").bindparams(
+                    match=" ".join(f'"{term}"*' for term in terms)
+                ),
+            )
+        )
+
+    return statement.order_by(rank.desc(), Task.id).limit(limit).offset(offset)
@@ -0,0 +1,33 @@
+from typing import Any, Iterable, List, Sequence
+
+from fastapi import Response
+from pydantic_core import to_json
+
+from app.models import Task
+from app.schemas import TaskResponse
+
+# Fast path for large task collections.
+#
+# The default path loads ORM objects, validates each through
+# List[TaskResponse] (from_attributes) and JSON-encodes the resulting dicts
+# with the stdlib encoder. Here the query selects exactly the TaskResponse
+# columns as plain rows and pydantic-core's Rust encoder turns them straight
+# into bytes. Output is the same JSON, field for field.
+
+TASK_RESPONSE_FIELDS: List[str] = list(TaskResponse.model_fields)
+TASK_RESPONSE_COLUMNS = [Task.__table__.c[name] for name in TASK_RESPONSE_FIELDS]
+
+
+def rows_to_json(rows: Iterable[Sequence[Any]], fields: List[str] = TASK_RESPONSE_FIELDS) -> bytes:
+    return to_json([dict(zip(fields, row)) for row in rows])
+
+
+class RawJSONResponse(Response):
+    """JSON response whose body is already encoded (or encodable by to_json)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return to_json(content)
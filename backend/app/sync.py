@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, tuple_
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import settings
+from app.models import Task, TaskTombstone
+
+# Delta sync over two ordered streams keyed by (timestamp, task id):
+# live tasks by (updated_at, id) and tombstones by (deleted_at, task_id).
+# Both are index seeks past the client's token, merged in memory.
+#
+# Timestamps are taken before commit, so a slow transaction can land with a
+# stamp older than rows a client has already seen. Once a client is caught
+# up its token is held back SYNC_SETTLE_SECONDS; the overlap is re-sent and
+# clients apply changes idempotently (upsert by id, delete by id).
+#
+# Tombstones are kept SYNC_TOMBSTONE_RETENTION_DAYS: each delete also prunes
+# the user's expired ones (an index range on the same key). A token older
+# than that horizon may have missed pruned deletions, so it is refused and
+# the client starts over from a snapshot.
+
+Key = Tuple[datetime, int]
+
+
+def retention_horizon() -> datetime:
+    return datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def token_expired(since: Key) -> bool:
+    """True if deletions after `since` may already have been pruned."""
+    return since[0] < retention_horizon()
+
+
+async def record_deletions(session: AsyncSession, user_id: int, task_ids: Iterable[int]) -> None:
+    """Log deleted tasks in the caller's transaction (one multi-row INSERT)."""
+    now = datetime.utcnow()
+    rows = [{"task_id": task_id, "user_id": user_id, "deleted_at": now} for task_id in task_ids]
+    if rows:
+        await session.execute(
+            delete(TaskTombstone)
+            .where(TaskTombstone.user_id == user_id, TaskTombstone.deleted_at < retention_horizon())
+        )
+        await session.execute(insert(TaskTombstone.__table__), rows)
+
+
+async def read_changes(
+    session: AsyncSession, user_id: int, since: Optional[Key], limit: int
+) -> Tuple[List[Task], List[int], Key, bool]:
+    """Return (changed tasks, deleted ids, next token key, has_more)."""
+    tasks_statement = select(Task).where(Task.user_id == user_id)
+    if since is not None:
+        tasks_statement = tasks_statement.where(tuple_(Task.updated_at, Task.id) > tuple_(*since))
+    tasks_statement = tasks_statement.order_by(Task.updated_at, Task.id).limit(limit + 1)
+    events = [
+        ((task.updated_at, task.id), task)
+        for task in (await session.execute(tasks_statement)).scalars().all()
+    ]
+
+    # A first sync (no token) is a snapshot; there is nothing to retract yet.
+    if since is not None:
+        tombstones_statement = (
+            select(TaskTombstone.deleted_at, TaskTombstone.task_id)
+            .where(
+                TaskTombstone.user_id == user_id,
+                tuple_(TaskTombstone.deleted_at, TaskTombstone.task_id) > tuple_(*since),
+            )
+            .order_by(TaskTombstone.deleted_at, TaskTombstone.task_id)
+            .limit(limit + 1)
+        )
+        events += [((deleted_at, task_id), None) for deleted_at, task_id in await session.execute(tombstones_statement)]
+
+    events.sort(key=lambda event: event[0])
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    floor = since or (datetime.min, 0)
+    last = events[-1][0] if events else floor
+    if not has_more:
+        settled = (datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS), 0)
+        last = max(floor, min(last, settled))
+
+    changed = [task for _, task in events if task is not None]
+    deleted = [key[1] for key, task in events if task is None]
+    return changed, deleted, last, has_more
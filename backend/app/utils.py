@@ -1,22 +0,0 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-import os
-
-security = HTTPBearer()
-
-SECRET_KEY = os.getenv("BETTER_AUTH_SECRET")
-ALGORITHM = "HS256"
-
-def verify_token(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-):
-    token = credentials.credentials
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return int(user_id)
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
@@ -0,0 +1,141 @@
+"""Cold-start report for the Vercel/Mangum entry point (api/index.py).
+
+Each run is a fresh interpreter, like a new container: it imports the
+handler, then sends synthetic API Gateway events through Mangum, timing
+the import, the first request, the first request that touches the
+database, and a warm repeat of it. One extra run with `-X importtime`
+lists the slowest imports.
+
+    cd backend
+    python -m bench.coldstart --runs 5 --output coldstart.json
+    python -m bench.coldstart --compare coldstart.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from bench.run import REPO, git_commit
+
+API_DIR = REPO / "api"
+
+# Runs in the child interpreter; prints one JSON line of timings (ms).
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import index
+imported = time.perf_counter()
+
+def event(method, path, body=None):
+    return {
+        "version": "2.0", "routeKey": "$default", "rawPath": path, "rawQueryString": "",
+        "headers": {"host": "coldstart.local", "content-type": "application/json"},
+        "requestContext": {"http": {"method": method, "path": path, "protocol": "HTTP/1.1",
+                                    "sourceIp": "127.0.0.1"}, "stage": "$default"},
+        "body": json.dumps(body) if body is not None else None, "isBase64Encoded": False,
+    }
+
+def timed(*args):
+    t = time.perf_counter()
+    response = index.handler(event(*args), None)
+    assert response["statusCode"] < 500, response
+    return (time.perf_counter() - t) * 1000
+
+# Unknown user: one SELECT, 401, no bcrypt
+login = ("POST", "/api/auth/login", {"username": "coldstart-nobody", "password": "x"})
+first = timed("GET", "/")
+first_db = timed(*login)
+warm_db = timed(*login)
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": first,
+    "first_db_request_ms": first_db,
+    "warm_db_request_ms": warm_db,
+}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--output", default="bench-coldstart.json")
+    parser.add_argument("--compare", help="earlier report JSON to diff against")
+    return parser.parse_args(argv)
+
+
+def child_env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env.setdefault("BETTER_AUTH_SECRET", "coldstart-secret")
+    return env
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import index"],
+        cwd=API_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    database_url = args.database_url or "sqlite+aiosqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="todo-coldstart-"), "coldstart.db"
+    )
+    env = child_env(database_url)
+
+    # Migrating is a deploy step, not part of the cold start
+    subprocess.run(
+        [sys.executable, "-m", "app.migrate", "upgrade"], cwd=REPO / "backend", env=env,
+        capture_output=True, check=True,
+    )
+
+    # The first run also warms the bytecode cache, as a deployed bundle would be
+    subprocess.run([sys.executable, "-c", PROBE], cwd=API_DIR, env=env, capture_output=True, check=True)
+    runs = []
+    for _ in range(args.runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=API_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "commit": git_commit(),
+        "runs": args.runs,
+        "median": {key: statistics.median(run[key] for run in runs) for key in runs[0]},
+        "slowest_imports": slowest_imports(env, args.top),
+    }
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    for key, value in report["median"].items():
+        line = f"{key:<22} {value:>9.1f}"
+        if baseline and baseline["median"].get(key):
+            line += f"  ({(value - baseline['median'][key]) / baseline['median'][key] * 100:+.1f}%)"
+        print(line)
+    print("slowest imports (cumulative ms):")
+    for row in report["slowest_imports"]:
+        print(f"  {row['cumulative_ms']:>8.1f}  {row['module']}")
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
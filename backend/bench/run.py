@@ -0,0 +1,348 @@
+"""In-process load benchmark for the task and auth APIs.
+
+Seeds a throwaway database, drives a weighted mix of requests through the
+ASGI app with httpx (no network, no server), and writes per-endpoint
+latency percentiles, throughput and SQL statement counts to JSON.
+
+    cd backend
+    python -m bench.run --target main --users 20 --tasks-per-user 500 \\
+        --requests 5000 --concurrency 16 --output bench-main.json
+    python -m bench.run --target serverless --compare bench-main.json
+
+Without --database-url a fresh SQLite file is created in a temp directory.
+Pass a disposable Postgres URL to benchmark the pooled engine; the harness
+creates its own users and never cleans up, so do not point it at real data.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND = Path(__file__).resolve().parent.parent
+REPO = BACKEND.parent
+PASSWORD = "bench-password"
+
+DEFAULT_MIX = "login=1,list=10,create=3,update=4,delete=2"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["main", "serverless"], default="main")
+    parser.add_argument("--database-url", help="defaults to a fresh SQLite file")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lists-per-user", type=int, default=5)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests first")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=100, help="limit for list requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted ops, e.g. " + DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args) -> None:
+    # Settings and the shared engine read the environment at import time,
+    # so this must run before anything under app.* is imported.
+    url = args.database_url
+    if not url:
+        url = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(prefix="todo-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = url
+    os.environ.setdefault("BETTER_AUTH_SECRET", "bench-secret")
+    os.environ.setdefault("DB_ECHO", "false")
+    # One client IP and one user drive all the load; measure the handlers,
+    # not the limiter's 429s
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # Repeated reads would all be cache hits; set it to "true" to measure those
+    os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+    sys.path.insert(0, str(BACKEND))
+
+
+def load_app(target: str):
+    if target == "main":
+        from app.main import app
+        return app
+    spec = importlib.util.spec_from_file_location("serverless_main", REPO / "api" / "serverless_main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+# ---------- SEEDING ----------
+
+async def seed(args) -> List[dict]:
+    """Insert users, lists and tasks directly; returns per-user state."""
+    from sqlalchemy import insert, select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.auth import create_access_token
+    from app.database import get_engine
+    from app.hashing import hash_password
+    from app.models import Task, TaskList, User
+
+    rng = random.Random(args.seed)
+    hashed = await hash_password(PASSWORD)  # one bcrypt; logins still verify for real
+    now = datetime.utcnow()
+    run_id = f"{int(time.time())}{rng.randrange(1000):03d}"
+    users = []
+
+    async with AsyncSession(get_engine()) as session:
+        for n in range(args.users):
+            username = f"bench{run_id}_{n}"
+            user_id = (await session.execute(
+                insert(User.__table__)
+                .values(username=username, email=f"{username}@bench.local",
+                        hashed_password=hashed, is_active=True, created_at=now)
+                .returning(User.__table__.c.id)
+            )).scalar_one()
+
+            list_ids = []
+            if args.lists_per_user:
+                list_rows = [
+                    {"name": f"List {i}", "user_id": user_id, "created_at": now}
+                    for i in range(args.lists_per_user)
+                ]
+                await session.execute(insert(TaskList.__table__), list_rows)
+                list_ids = list((await session.execute(
+                    select(TaskList.id).where(TaskList.user_id == user_id)
+                )).scalars().all())
+
+            task_rows = [
+                {
+                    "title": f"Task {i}",
+                    "description": "seeded by bench" if i % 3 else None,
+                    "completed": rng.random() < 0.3,
+                    "due_date": None,
+                    "list_id": rng.choice(list_ids) if list_ids and rng.random() < 0.7 else None,
+                    "user_id": user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(args.tasks_per_user)
+            ]
+            if task_rows:
+                await session.execute(insert(Task.__table__), task_rows)
+            task_ids = list((await session.execute(
+                select(Task.id).where(Task.user_id == user_id)
+            )).scalars().all())
+
+            users.append({
+                "username": username,
+                "token": create_access_token({"sub": str(user_id), "username": username}),
+                "task_ids": task_ids,
+            })
+        await session.commit()
+    return users
+
+
+# ---------- WORKLOAD ----------
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"unknown operation in --mix: {name!r} (known: {', '.join(OPERATIONS)})")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def op_login(client, user, rng, args):
+    return await client.post("/api/auth/login", json={"username": user["username"], "password": PASSWORD})
+
+
+async def op_list(client, user, rng, args):
+    return await client.get("/api/tasks", params={"limit": args.page_size}, headers=auth(user))
+
+
+async def op_create(client, user, rng, args):
+    response = await client.post("/api/tasks", json={"title": f"bench {rng.random():.6f}"}, headers=auth(user))
+    if response.status_code == 200:
+        user["task_ids"].append(response.json()["id"])
+    return response
+
+
+async def op_update(client, user, rng, args):
+    if not user["task_ids"]:
+        return await op_create(client, user, rng, args)
+    task_id = rng.choice(user["task_ids"])
+    return await client.put(f"/api/tasks/{task_id}", json={"completed": rng.random() < 0.5}, headers=auth(user))
+
+
+async def op_delete(client, user, rng, args):
+    if not user["task_ids"]:
+        return await op_create(client, user, rng, args)
+    task_id = user["task_ids"].pop(rng.randrange(len(user["task_ids"])))
+    return await client.delete(f"/api/tasks/{task_id}", headers=auth(user))
+
+
+OPERATIONS = {
+    "login": op_login,
+    "list": op_list,
+    "create": op_create,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+def auth(user) -> dict:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+def query_count(response) -> int:
+    # Server-Timing carries db;desc="N queries" (app.metrics)
+    for part in response.headers.get("server-timing", "").split(","):
+        if part.strip().startswith("db;"):
+            for field in part.split(";"):
+                if field.startswith('desc="'):
+                    return int(field[6:].split()[0])
+    return 0
+
+
+async def drive(app, users, args, mix: Dict[str, int]):
+    import httpx
+
+    samples = defaultdict(list)  # op -> [(seconds, status, queries)]
+    names, weights = list(mix), list(mix.values())
+    remaining = {"warmup": args.warmup, "measured": args.requests}
+
+    async def worker(index: int, client):
+        rng = random.Random(args.seed * 1000 + index)
+        user = users[index % len(users)]
+        while True:
+            if remaining["warmup"] > 0:
+                remaining["warmup"] -= 1
+                measured = False
+            elif remaining["measured"] > 0:
+                remaining["measured"] -= 1
+                measured = True
+            else:
+                return
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            response = await OPERATIONS[name](client, user, rng, args)
+            elapsed = time.perf_counter() - started
+            if measured:
+                samples[name].append((elapsed, response.status_code, query_count(response)))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i, client) for i in range(args.concurrency)))
+        wall = time.perf_counter() - started
+    return samples, wall
+
+
+# ---------- REPORTING ----------
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, wall: float) -> dict:
+    endpoints = {}
+    for name, rows in sorted(samples.items()):
+        latencies = sorted(seconds for seconds, _, _ in rows)
+        endpoints[name] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status, _ in rows if status >= 400),
+            "throughput_rps": len(rows) / wall if wall else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": statistics.fmean(latencies) * 1000,
+            "queries_mean": statistics.fmean(q for _, _, q in rows),
+            "queries_max": max(q for _, _, q in rows),
+        }
+    total = sum(len(rows) for rows in samples.values())
+    return {"wall_seconds": wall, "throughput_rps": total / wall if wall else 0.0, "endpoints": endpoints}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(summary: dict, baseline: dict = None) -> None:
+    header = f"{'endpoint':<8} {'reqs':>6} {'err':>4} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'queries':>7}"
+    print(header)
+    for name, row in summary["endpoints"].items():
+        print(f"{name:<8} {row['requests']:>6} {row['errors']:>4} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['queries_mean']:>7.2f}")
+        previous = (baseline or {}).get("endpoints", {}).get(name)
+        if previous:
+            deltas = [
+                f"{key} {(row[key] - previous[key]) / previous[key] * 100:+.1f}%"
+                for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+                if previous[key]
+            ]
+            deltas.append(f"queries {row['queries_mean'] - previous['queries_mean']:+.2f}")
+            print(f"{'':<8}   vs baseline: " + ", ".join(deltas))
+    print(f"total {summary['throughput_rps']:.1f} req/s over {summary['wall_seconds']:.2f}s")
+
+
+async def run(args) -> dict:
+    app = load_app(args.target)
+    mix = parse_mix(args.mix)
+    # httpx's ASGI transport does not send lifespan events; run it here so
+    # tables exist and startup/shutdown match a real deployment.
+    from app.database import get_engine
+    from app.migrate import upgrade
+    await upgrade(get_engine())
+
+    async with app.router.lifespan_context(app):
+        users = await seed(args)
+        samples, wall = await drive(app, users, args, mix)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "target": args.target,
+        "database": get_engine().dialect.name,
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "lists_per_user", "tasks_per_user", "requests", "warmup",
+                        "concurrency", "page_size", "mix", "seed")
+        },
+        **summarize(samples, wall),
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    configure_environment(args)
+    results = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+    print_report(results, baseline)
+
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
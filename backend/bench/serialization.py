@@ -0,0 +1,133 @@
+"""Per-row cost of serializing task collections: ORM path vs fast path.
+
+"orm" is what GET /api/tasks used to do: load Task objects, run them
+through FastAPI's response_model (List[TaskResponse], from_attributes) and
+the default JSONResponse. "fast" is the current path: select the
+TaskResponse columns as rows and encode them with app.serialization.
+Both are timed on the same seeded rows, with and without the fetch, and
+the two bodies are checked to decode to the same JSON.
+
+    cd backend
+    python -m bench.serialization --rows 5000 --repeat 20 --output bench-serialization.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from bench.run import BACKEND, git_commit
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="bench-serialization.json")
+    return parser.parse_args(argv)
+
+
+async def run(args) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from sqlalchemy import insert
+    from sqlmodel import select
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.database import get_engine
+    from app.migrate import upgrade
+    from app.models import Task, User
+    from app.schemas import TaskResponse
+    from app.serialization import TASK_RESPONSE_COLUMNS, RawJSONResponse, rows_to_json
+
+    engine = get_engine()
+    await upgrade(engine)
+    now = datetime.utcnow()
+    async with AsyncSession(engine) as session:
+        user_id = (await session.execute(
+            insert(User.__table__)
+            .values(username="serialization", email="serialization@bench.local",
+                    hashed_password="-", is_active=True, created_at=now)
+            .returning(User.__table__.c.id)
+        )).scalar_one()
+        await session.execute(insert(Task.__table__), [
+            {"title": f"Task {i}", "description": "x" * (i % 200) or None, "completed": i % 3 == 0,
+             "due_date": date(2026, 1, 1) + timedelta(days=i % 90), "list_id": None,
+             "user_id": user_id, "created_at": now, "updated_at": now}
+            for i in range(args.rows)
+        ])
+        await session.commit()
+
+    response_field = create_response_field(name="Response_get_tasks", type_=List[TaskResponse])
+
+    async def orm_fetch(session):
+        return (await session.execute(select(Task).where(Task.user_id == user_id))).scalars().all()
+
+    async def orm_encode(tasks):
+        content = await serialize_response(field=response_field, response_content=tasks)
+        return JSONResponse(content).body
+
+    async def fast_fetch(session):
+        return (await session.execute(select(*TASK_RESPONSE_COLUMNS).where(Task.user_id == user_id))).all()
+
+    async def fast_encode(rows):
+        return RawJSONResponse(rows_to_json(rows)).body
+
+    async def measure(fetch, encode):
+        full, encode_only, body = [], [], b""
+        for _ in range(args.repeat):
+            async with AsyncSession(engine) as session:
+                started = time.process_time()
+                loaded = await fetch(session)
+                fetched = time.process_time()
+                body = await encode(loaded)
+                finished = time.process_time()
+            full.append(finished - started)
+            encode_only.append(finished - fetched)
+        per_row = lambda samples: statistics.median(samples) / args.rows * 1e6  # noqa: E731
+        return {"fetch_and_encode_us_per_row": per_row(full), "encode_us_per_row": per_row(encode_only)}, body
+
+    orm, orm_body = await measure(orm_fetch, orm_encode)
+    fast, fast_body = await measure(fast_fetch, fast_encode)
+    await engine.dispose()
+
+    return {
+        "commit": git_commit(),
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "bodies_equal": json.loads(orm_body) == json.loads(fast_body),
+        "orm": orm,
+        "fast": fast,
+        "speedup": {key: orm[key] / fast[key] for key in orm if fast[key]},
+    }
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///" + os.path.join(
+        tempfile.mkdtemp(prefix="todo-serialization-"), "bench.db"
+    )
+    os.environ.setdefault("BETTER_AUTH_SECRET", "bench-secret")
+    sys.path.insert(0, str(BACKEND))
+
+    report = asyncio.run(run(args))
+    print(f"{'path':<6} {'fetch+encode us/row':>20} {'encode us/row':>14}")
+    for path in ("orm", "fast"):
+        row = report[path]
+        print(f"{path:<6} {row['fetch_and_encode_us_per_row']:>20.2f} {row['encode_us_per_row']:>14.2f}")
+    print("speedup: " + ", ".join(f"{key} x{value:.1f}" for key, value in report["speedup"].items()))
+    print(f"bodies equal: {report['bodies_equal']}")
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
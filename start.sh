@@ -1,4 +1,5 @@
 #!/bin/bash
 cd backend
 pip3 install -r requirements.txt
+python3 -m app.migrate upgrade
 python3 -m uvicorn app.main:app --host 0.0.0.0 --port $PORT
\ No newline at end of file